@@ -0,0 +1,122 @@
+"""
+Cached, pre-serialized payloads of the public reference endpoints.
+
+Each payload is rebuilt once per version of its data (see apps.core.cache)
+and then served without touching the database.
+"""
+import hashlib
+from collections import defaultdict
+
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.cache import cached_payload, get_versions
+from apps.core.models import DanceProfession, Level, MenuItem, SiteConfiguration
+from apps.core.styles import STYLE_TREE_VERSION_KEYS, load_style_tree
+from .serializers import (
+    DanceProfessionSerializer, DanceStyleSerializer, LevelSerializer, MenuItemSerializer, SiteConfigurationSerializer
+)
+
+
+def site_configuration_payload():
+    """Serialized site configuration, including the computed ``video_id``."""
+    def build():
+        return dict(SiteConfigurationSerializer(SiteConfiguration.load()).data)
+    return cached_payload(SiteConfiguration.CACHE_VERSION_KEY, 'payload', build)
+
+
+def menu_tree_payload():
+    """
+    Active menu tree, built from one ordered query.
+
+    Returns a dict with the root items (``results``), their pre-rendered JSON
+    (``results_json``) and the pre-rendered JSON of every active item with its
+    children, by slug (``subtrees``).
+    """
+    def build():
+        children_map = defaultdict(list)
+        for item in MenuItem.objects.filter(is_active=True).order_by('order', 'name'):
+            children_map[item.parent_id].append(item)
+        context = {'children_map': children_map}
+        renderer = JSONRenderer()
+
+        results = MenuItemSerializer(children_map.get(None, []), many=True, context=context).data
+        subtrees = {}
+        stack = list(results)
+        while stack:
+            item = stack.pop()
+            subtrees[item['slug']] = renderer.render(item)
+            stack.extend(item['children'])
+        return {
+            'results': list(results),
+            'results_json': renderer.render(results),
+            'subtrees': subtrees,
+        }
+    return cached_payload(MenuItem.CACHE_VERSION_KEY, 'tree', build)
+
+
+def style_tree_payload():
+    """
+    Dance style tree with rolled-up course counts, built from one query.
+
+    Returns a dict with the root styles (``results``) and every style with
+    its sub-styles, by slug (``by_slug``).
+    """
+    def build():
+        children_map, course_counts = load_style_tree()
+        context = {'children_map': children_map, 'course_counts': course_counts}
+        results = list(DanceStyleSerializer(children_map.get(None, []), many=True, context=context).data)
+        by_slug = {}
+        stack = list(results)
+        while stack:
+            style = stack.pop()
+            by_slug[style['slug']] = style
+            stack.extend(style['sub_styles'])
+        return {'results': results, 'by_slug': by_slug}
+    return cached_payload(STYLE_TREE_VERSION_KEYS, 'tree', build)
+
+
+def styles_payload():
+    """Root dance styles with their nested sub-styles and course counts."""
+    return style_tree_payload()['results']
+
+
+def levels_payload():
+    def build():
+        return list(LevelSerializer(Level.objects.all(), many=True).data)
+    return cached_payload(Level.CACHE_VERSION_KEY, 'payload', build)
+
+
+def professions_payload():
+    def build():
+        return list(DanceProfessionSerializer(DanceProfession.objects.all(), many=True).data)
+    return cached_payload(DanceProfession.CACHE_VERSION_KEY, 'payload', build)
+
+
+# Data versions the bootstrap bundle depends on
+BOOTSTRAP_VERSION_KEYS = (
+    SiteConfiguration.CACHE_VERSION_KEY,
+    MenuItem.CACHE_VERSION_KEY,
+    *STYLE_TREE_VERSION_KEYS,
+    Level.CACHE_VERSION_KEY,
+    DanceProfession.CACHE_VERSION_KEY,
+)
+
+
+def bootstrap_etag(request, *args, **kwargs):
+    """Strong ETag of the bootstrap bundle, combined from the versions of its parts."""
+    versions = get_versions(BOOTSTRAP_VERSION_KEYS)
+    digest = hashlib.sha1(repr(versions).encode('utf-8')).hexdigest()[:20]
+    return f'"bootstrap-{digest}"'
+
+
+def bootstrap_payload():
+    """Pre-rendered JSON bundle of the reference data needed for the first paint."""
+    def build():
+        return JSONRenderer().render({
+            'config': site_configuration_payload(),
+            'menu': menu_tree_payload()['results'],
+            'styles': styles_payload(),
+            'levels': levels_payload(),
+            'professions': professions_payload(),
+        })
+    return cached_payload(BOOTSTRAP_VERSION_KEYS, 'bundle', build)
@@ -3,12 +3,24 @@ from apps.core.models import DanceStyle, Level, DanceProfession, SiteConfigurati
 
 class DanceStyleSerializer(serializers.ModelSerializer):
     sub_styles = serializers.SerializerMethodField()
+    course_count = serializers.SerializerMethodField()
     
     class Meta:
         model = DanceStyle
-        fields = ['id', 'name', 'slug', 'icon', 'description', 'parent', 'sub_styles']
+        fields = ['id', 'name', 'slug', 'icon', 'description', 'parent', 'sub_styles', 'course_count']
+    
+    def get_course_count(self, obj):
+        """Active courses of the style and of all its sub-styles"""
+        course_counts = self.context.get('course_counts')
+        if course_counts is not None:
+            return course_counts.get(obj.id, 0)
+        return None
     
     def get_sub_styles(self, obj):
+        children_map = self.context.get('children_map')
+        if children_map is not None:
+            # Tree preloaded by load_style_tree(): no query per style
+            return DanceStyleSerializer(children_map.get(obj.id, []), many=True, context=self.context).data
         if obj.sub_styles.exists():
             return DanceStyleSerializer(obj.sub_styles.all(), many=True).data
         return []
@@ -53,6 +65,10 @@ class MenuItemSerializer(serializers.ModelSerializer):
     
     def get_children(self, obj):
         """Recursively serialize active children items"""
+        children_map = self.context.get('children_map')
+        if children_map is not None:
+            # Active items preloaded and grouped by parent: no query per item
+            return MenuItemSerializer(children_map.get(obj.id, []), many=True, context=self.context).data
         children = obj.children.filter(is_active=True).order_by('order', 'name')
         if children.exists():
             return MenuItemSerializer(children, many=True).data
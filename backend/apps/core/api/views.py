@@ -1,15 +1,39 @@
+from django.http import Http404, HttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from apps.core.models import DanceStyle, Level, DanceProfession, SiteConfiguration, MenuItem
+from apps.core.models import DanceStyle, Level, DanceProfession, MenuItem
+from .payloads import (
+    bootstrap_etag, bootstrap_payload, menu_tree_payload, site_configuration_payload, style_tree_payload
+)
 from .serializers import DanceStyleSerializer, LevelSerializer, DanceProfessionSerializer, SiteConfigurationSerializer, MenuItemSerializer
 
 class DanceStyleViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Dance style tree with, for each style, the number of active courses of
+    the style and its sub-styles (``course_count``).
+    Served from a cached tree rebuilt when a style or a course changes.
+    """
     queryset = DanceStyle.objects.filter(parent=None)
     serializer_class = DanceStyleSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
 
+    def list(self, request, *args, **kwargs):
+        results = style_tree_payload()['results']
+        page = self.paginate_queryset(results)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(results)
+
+    def retrieve(self, request, *args, **kwargs):
+        style = style_tree_payload()['by_slug'].get(kwargs[self.lookup_field])
+        if style is None:
+            raise Http404
+        return Response(style)
+
 class LevelViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Level.objects.all()
     serializer_class = LevelSerializer
@@ -26,13 +50,27 @@ class SiteConfigurationViewSet(viewsets.ViewSet):
     """
     Singleton endpoint for site configuration.
     GET /api/common/config/ returns the current site configuration.
+    The serialized payload is cached until the configuration is saved.
     """
     permission_classes = [permissions.AllowAny]
+    serializer_class = SiteConfigurationSerializer
     
     def list(self, request):
-        config = SiteConfiguration.load()
-        serializer = SiteConfigurationSerializer(config)
-        return Response(serializer.data)
+        return Response(site_configuration_payload())
+
+
+class BootstrapViewSet(viewsets.ViewSet):
+    """
+    Reference data needed for the first paint, in one response.
+    GET /api/common/bootstrap/ returns the site configuration, the menu tree,
+    the dance styles, levels and professions, pre-rendered from the cache and
+    versioned with a combined ETag.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    @method_decorator(condition(etag_func=bootstrap_etag))
+    def list(self, request):
+        return HttpResponse(bootstrap_payload(), content_type='application/json')
 
 
 class MenuItemViewSet(viewsets.ReadOnlyModelViewSet):
@@ -41,9 +79,28 @@ class MenuItemViewSet(viewsets.ReadOnlyModelViewSet):
     Returns only active root items with their children nested recursively.
     
     GET /api/menu/items/ - List all root menu items with children
-    GET /api/menu/items/{slug}/ - Get a specific menu item by slug
+    GET /api/menu/items/{slug}/ - Get a specific menu item (and its children) by slug
+    
+    Both are served from the cached, pre-rendered menu tree.
     """
     queryset = MenuItem.objects.filter(parent=None, is_active=True).order_by('order', 'name')
     serializer_class = MenuItemSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
+
+    def list(self, request, *args, **kwargs):
+        tree = menu_tree_payload()
+        if 'page' not in request.query_params and len(tree['results']) <= self.paginator.page_size:
+            # Single page: send the pre-rendered JSON as is
+            body = b'{"count":%d,"next":null,"previous":null,"results":%s}' % (
+                len(tree['results']), tree['results_json']
+            )
+            return HttpResponse(body, content_type='application/json')
+        page = self.paginate_queryset(tree['results'])
+        return self.get_paginated_response(page)
+
+    def retrieve(self, request, *args, **kwargs):
+        subtree = menu_tree_payload()['subtrees'].get(kwargs[self.lookup_field])
+        if subtree is None:
+            raise Http404
+        return HttpResponse(subtree, content_type='application/json')
@@ -0,0 +1,86 @@
+"""
+Version counters kept in the shared cache.
+
+A version is bumped whenever the data behind a cached payload changes, so
+readers can build cache keys and ETags from it without touching the database.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _fresh_version():
+    # A cold cache (restart, eviction) must never hand out a version that was
+    # already used, otherwise stale ETags would match again.
+    return time.time_ns() // 1000
+
+
+def get_version(key):
+    """Return the current version stored under ``key`` (one cache lookup)."""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(keys):
+    """Versions of several keys, fetched in a single cache round trip."""
+    versions = cache.get_many(keys)
+    return tuple(
+        versions[key] if key in versions else get_version(key) for key in keys
+    )
+
+
+def bump_version(key):
+    """Increment the version once the current transaction commits."""
+    def bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_version(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+# Versioned payloads are never invalidated in place, old versions just expire
+PAYLOAD_TIMEOUT = 60 * 60 * 24
+
+_local_payloads = {}
+_local_lock = threading.Lock()
+
+
+def cached_payload(version_key, name, build, local=True):
+    """
+    Return ``build()`` cached for the current version of ``version_key``
+    (a key, or a tuple of keys when the payload depends on several versions).
+
+    Two layers: a process-local copy, then the shared cache. In the steady
+    state the only cost is the version lookup; ``build()`` (and the database)
+    is hit once per version across all processes. Pass ``local=False`` for
+    payloads with an open-ended set of names (e.g. per date window), which
+    must not pile up in process memory.
+    """
+    if isinstance(version_key, tuple):
+        version = get_versions(version_key)
+        version_label = '-'.join(str(part) for part in version)
+        version_key = '+'.join(version_key)
+    else:
+        version = version_label = get_version(version_key)
+    local_key = (version_key, name)
+    if local:
+        cached = _local_payloads.get(local_key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+    shared_key = f'{version_key}:{name}:{version_label}'
+    payload = cache.get(shared_key)
+    if payload is None:
+        payload = build()
+        cache.set(shared_key, payload, PAYLOAD_TIMEOUT)
+    if local:
+        with _local_lock:
+            _local_payloads[local_key] = (version, payload)
+    return payload
@@ -1,6 +1,9 @@
 from django.db import models
+import copy
 import uuid
 
+from apps.core.cache import bump_version, cached_payload
+
 class BaseModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -22,6 +25,11 @@ class DanceStyle(BaseModel):
     icon = models.CharField(max_length=50, blank=True)
     description = models.TextField(blank=True)
 
+    # Version of the cached style payloads, bumped on save / delete (signals)
+    CACHE_VERSION_KEY = 'core:styles'
+    # Bumped when a Course is saved or deleted (apps.courses.signals)
+    COURSE_COUNTS_VERSION_KEY = 'core:styles-course-counts'
+
     class Meta:
         verbose_name = "Style de danse"
         verbose_name_plural = "Styles de danse"
@@ -36,6 +44,8 @@ class Level(BaseModel):
     color = models.CharField(max_length=7, default="#3b82f6")
     description = models.TextField(blank=True)
 
+    CACHE_VERSION_KEY = 'core:levels'
+
     class Meta:
         verbose_name = "Niveau"
         verbose_name_plural = "Niveaux"
@@ -49,6 +59,8 @@ class DanceProfession(BaseModel):
     slug = models.SlugField(unique=True)
     description = models.TextField(blank=True)
 
+    CACHE_VERSION_KEY = 'core:professions'
+
     def __str__(self):
         return self.name
 
@@ -88,6 +100,9 @@ class SiteConfiguration(models.Model):
     
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Version of the cached instance / API payload, bumped by save()
+    CACHE_VERSION_KEY = 'core:site-configuration'
+    
     class Meta:
         verbose_name = "Configuration du Site"
         verbose_name_plural = "Configuration du Site"
@@ -99,6 +114,7 @@ class SiteConfiguration(models.Model):
         # Ensure only one instance exists (Singleton pattern)
         self.pk = 1
         super().save(*args, **kwargs)
+        bump_version(self.CACHE_VERSION_KEY)
     
     def delete(self, *args, **kwargs):
         # Prevent deletion
@@ -106,9 +122,12 @@ class SiteConfiguration(models.Model):
     
     @classmethod
     def load(cls):
-        """Get or create the singleton instance"""
-        obj, created = cls.objects.get_or_create(pk=1)
-        return obj
+        """Get or create the singleton instance (cached until the next save)"""
+        def build():
+            obj, created = cls.objects.get_or_create(pk=1)
+            return obj
+        # Callers get their own copy of the cached instance
+        return copy.copy(cached_payload(cls.CACHE_VERSION_KEY, 'instance', build))
 
 
 class MenuItem(BaseModel):
@@ -161,6 +180,9 @@ class MenuItem(BaseModel):
         verbose_name_plural = "Éléments de menu"
         ordering = ['order', 'name']
 
+    # Version of the cached menu tree, bumped on every save / delete (signals)
+    CACHE_VERSION_KEY = 'core:menu'
+
     def __str__(self):
         if self.parent:
             return f"{self.parent.name} > {self.name}"
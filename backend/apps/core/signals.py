@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.cache import bump_version
+from apps.core.models import DanceProfession, DanceStyle, Level, MenuItem
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def bump_menu_version(sender, **kwargs):
+    # Also covers the admin list_editable reorders, saved item by item
+    bump_version(MenuItem.CACHE_VERSION_KEY)
+
+
+@receiver(post_save, sender=DanceStyle)
+@receiver(post_delete, sender=DanceStyle)
+@receiver(post_save, sender=Level)
+@receiver(post_delete, sender=Level)
+@receiver(post_save, sender=DanceProfession)
+@receiver(post_delete, sender=DanceProfession)
+def bump_reference_version(sender, **kwargs):
+    bump_version(sender.CACHE_VERSION_KEY)
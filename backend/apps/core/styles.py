@@ -0,0 +1,64 @@
+"""
+Dance style tree loader.
+
+The whole style table is read in one query, annotated with the number of
+active courses of each style; counts are then rolled up to the ancestors in
+memory, so a parent style also counts the courses of its sub-styles.
+"""
+from collections import defaultdict
+
+from django.db.models import Count, Q
+
+from apps.core.cache import cached_payload
+from apps.core.models import DanceStyle
+
+# The style tree changes with the styles themselves and with the courses
+STYLE_TREE_VERSION_KEYS = (DanceStyle.CACHE_VERSION_KEY, DanceStyle.COURSE_COUNTS_VERSION_KEY)
+
+
+def load_style_tree():
+    """
+    Return ``(children_map, course_counts)``: styles grouped by parent id
+    (roots under ``None``) and the rolled-up active course count of each style.
+    """
+    styles = DanceStyle.objects.annotate(
+        own_course_count=Count('courses', filter=Q(courses__is_active=True))
+    )
+    children_map = defaultdict(list)
+    for style in styles:
+        children_map[style.parent_id].append(style)
+
+    course_counts = {}
+
+    def rollup(style):
+        total = style.own_course_count
+        for child in children_map.get(style.id, []):
+            total += rollup(child)
+        course_counts[style.id] = total
+        return total
+
+    for root in children_map.get(None, []):
+        rollup(root)
+    return children_map, course_counts
+
+
+def style_descendants():
+    """Cached ``{slug: [id of the style and of all its sub-styles]}``."""
+    def build():
+        children_map = defaultdict(list)
+        slugs = {}
+        for style_id, slug, parent_id in DanceStyle.objects.values_list('id', 'slug', 'parent_id'):
+            children_map[parent_id].append(style_id)
+            slugs[style_id] = slug
+
+        descendants = {}
+        for style_id, slug in slugs.items():
+            ids = []
+            stack = [style_id]
+            while stack:
+                current = stack.pop()
+                ids.append(current)
+                stack.extend(children_map.get(current, []))
+            descendants[slug] = ids
+        return descendants
+    return cached_payload(DanceStyle.CACHE_VERSION_KEY, 'descendants', build)
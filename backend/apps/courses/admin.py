@@ -1,19 +1,98 @@
 from django.contrib import admin
-from .models import Course, Schedule, Enrollment
+from django.core.exceptions import ValidationError
+from django.forms.models import BaseInlineFormSet
+from .conflicts import describe_conflicts, find_conflicts
+from .enrollment import cancel, enroll, promote_waitlist
+from .models import Attendance, Course, Enrollment, Holiday, Schedule, ScheduleException
+
+class ScheduleInlineFormSet(BaseInlineFormSet):
+    """
+    Rejects schedules of the course that overlap each other on a teacher or
+    a location. Conflicts with the other courses are reported per form by
+    Schedule.clean(). Teachers are those currently saved on the course.
+    """
+    def clean(self):
+        super().clean()
+        if any(self.errors):
+            return
+        slots = [
+            form.instance.as_slot() for form in self.forms
+            if form.cleaned_data and not form.cleaned_data.get('DELETE')
+        ]
+        teacher_ids = set() if self.instance._state.adding else set(
+            self.instance.teachers.values_list('pk', flat=True)
+        )
+        conflicts = find_conflicts(slots, {self.instance.pk: teacher_ids})
+        if conflicts:
+            raise ValidationError(describe_conflicts(conflicts))
 
 class ScheduleInline(admin.TabularInline):
     model = Schedule
+    formset = ScheduleInlineFormSet
     extra = 1
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
-    list_display = ('name', 'style', 'level', 'node', 'is_active')
+    list_display = ('name', 'style', 'level', 'node', 'enrolled_count', 'capacity', 'attendance_rate', 'is_active')
     list_filter = ('style', 'level', 'node', 'is_active')
+    readonly_fields = ('enrolled_count', 'attendance_recorded', 'attendance_present')
     prepopulated_fields = {'slug': ('name',)}
     inlines = [ScheduleInline]
     filter_horizontal = ('teachers',)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'capacity' in form.changed_data:
+            # Seats added: give them to the waitlist
+            promote_waitlist(obj.pk)
+
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
-    list_display = ('user', 'course', 'enrolled_at', 'is_active')
-    list_filter = ('course', 'is_active')
+    list_display = ('user', 'course', 'status', 'enrolled_at', 'waitlisted_at')
+    list_filter = ('course', 'status')
+    # Admission goes through apps.courses.enrollment to keep the seat counters right
+    readonly_fields = ('status', 'waitlisted_at', 'is_active')
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            # Moving an enrollment would bypass the seat counters of both courses
+            return self.readonly_fields + ('course',)
+        return self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            return super().save_model(request, obj, form, change)
+        enrollment = enroll(obj.user, obj.course)
+        obj.pk, obj.status, obj.waitlisted_at = enrollment.pk, enrollment.status, enrollment.waitlisted_at
+
+    def delete_model(self, request, obj):
+        cancel(obj)
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        for enrollment in queryset:
+            cancel(enrollment)
+        super().delete_queryset(request, queryset)
+
+@admin.register(ScheduleException)
+class ScheduleExceptionAdmin(admin.ModelAdmin):
+    list_display = ('schedule', 'date', 'is_cancelled', 'start_time', 'end_time', 'location_name', 'reason')
+    list_filter = ('is_cancelled', 'schedule__course')
+    date_hierarchy = 'date'
+    list_select_related = ('schedule__course',)
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ('name', 'start_date', 'end_date')
+
+@admin.register(Attendance)
+class AttendanceAdmin(admin.ModelAdmin):
+    list_display = ('enrollment', 'schedule', 'session_date', 'is_present')
+    list_filter = ('is_present', 'schedule__course')
+    date_hierarchy = 'session_date'
+    list_select_related = ('enrollment__user', 'enrollment__course', 'schedule__course')
+    # Written through the attendance endpoint, which maintains the rates
+    readonly_fields = ('enrollment', 'schedule', 'session_date', 'is_present')
+
+    def has_add_permission(self, request):
+        return False
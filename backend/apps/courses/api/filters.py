@@ -0,0 +1,135 @@
+from collections import Counter
+
+import django_filters
+from django.db.models import Count, Exists, OuterRef
+from apps.core.styles import style_descendants
+from apps.courses.models import Course, Schedule
+from apps.organization.models import OrganizationNode
+
+
+class CourseFilter(django_filters.FilterSet):
+    """
+    Catalog filters of the cours page.
+
+    * ``style`` (or ``style__slug``): style slug, sub-styles included;
+    * ``level``: level slug;
+    * ``node``: organization node slug, whole branch included;
+    * ``day_of_week``, ``starts_after``, ``starts_before``: at least one
+      schedule of the course on that day and within that time-of-day window;
+    * ``teacher``: teacher id.
+    """
+    style = django_filters.CharFilter(method='filter_style')
+    style__slug = django_filters.CharFilter(method='filter_style')
+    level = django_filters.CharFilter(field_name='level__slug')
+    node = django_filters.CharFilter(method='filter_node')
+    day_of_week = django_filters.TypedChoiceFilter(
+        choices=Schedule.DAYS, coerce=int, empty_value=None, method='filter_schedules'
+    )
+    starts_after = django_filters.TimeFilter(method='filter_schedules')
+    starts_before = django_filters.TimeFilter(method='filter_schedules')
+    teacher = django_filters.UUIDFilter(field_name='teachers')
+
+    # Query parameters ignored when counting each facet, so that a facet
+    # shows what selecting another value of the same dimension would give
+    FACET_PARAMS = {
+        'style': ('style', 'style__slug'),
+        'level': ('level',),
+        'node': ('node',),
+        'day_of_week': ('day_of_week',),
+        'teacher': ('teacher',),
+    }
+
+    class Meta:
+        model = Course
+        fields = []
+
+    def filter_style(self, queryset, name, value):
+        style_ids = style_descendants().get(value)
+        if style_ids is None:
+            return queryset.none()
+        return queryset.filter(style_id__in=style_ids)
+
+    def filter_node(self, queryset, name, value):
+        path = OrganizationNode.objects.filter(slug=value).values_list('path', flat=True).first()
+        if path is None:
+            return queryset.none()
+        return queryset.filter(node__path__startswith=path)
+
+    def filter_schedules(self, queryset, name, value):
+        # Day and time window must hold for the same schedule: they are all
+        # applied at once in filter_queryset()
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        conditions = {}
+        if self.form.cleaned_data.get('day_of_week') is not None:
+            conditions['day_of_week'] = self.form.cleaned_data['day_of_week']
+        if self.form.cleaned_data.get('starts_after') is not None:
+            conditions['start_time__gte'] = self.form.cleaned_data['starts_after']
+        if self.form.cleaned_data.get('starts_before') is not None:
+            conditions['start_time__lte'] = self.form.cleaned_data['starts_before']
+        if conditions:
+            queryset = queryset.filter(
+                Exists(Schedule.objects.filter(course=OuterRef('pk'), **conditions))
+            )
+        return queryset
+
+    def get_facets(self):
+        """
+        Course counts per value of every dimension: one aggregate query per
+        facet (plus one to name the nodes), each computed with the other
+        filters applied.
+        """
+        if not self.is_valid():
+            return {}
+        facets = {}
+        for name, params in self.FACET_PARAMS.items():
+            data = self.data.copy()
+            for param in params:
+                data.pop(param, None)
+            queryset = type(self)(data, queryset=self.queryset, request=self.request).qs.order_by()
+            facets[name] = getattr(self, f'count_{name}')(queryset)
+        return facets
+
+    def count_style(self, queryset):
+        counts = dict(queryset.values_list('style_id').annotate(count=Count('id')))
+        # Rolled up to the parent styles, like the style filter
+        return {
+            slug: total
+            for slug, style_ids in style_descendants().items()
+            if (total := sum(counts.get(style_id, 0) for style_id in style_ids))
+        }
+
+    def count_level(self, queryset):
+        return dict(queryset.values_list('level__slug').annotate(count=Count('id')))
+
+    def count_node(self, queryset):
+        # Rolled up to every ancestor of the course node, like the node filter
+        counts = Counter()
+        for path, count in queryset.values_list('node__path').annotate(count=Count('id')):
+            for segment in path.split(OrganizationNode.PATH_SEPARATOR)[:-1]:
+                counts[segment] += count
+        slugs = dict(
+            OrganizationNode.objects.filter(id__in=list(counts)).values_list('id', 'slug')
+        ) if counts else {}
+        return {slug: counts[node_id.hex] for node_id, slug in slugs.items()}
+
+    def count_day_of_week(self, queryset):
+        # Only the schedules within the time-of-day window count
+        window = {}
+        if self.form.cleaned_data.get('starts_after') is not None:
+            window['schedules__start_time__gte'] = self.form.cleaned_data['starts_after']
+        if self.form.cleaned_data.get('starts_before') is not None:
+            window['schedules__start_time__lte'] = self.form.cleaned_data['starts_before']
+        return dict(
+            queryset.filter(schedules__isnull=False, **window).values_list('schedules__day_of_week')
+            .annotate(count=Count('id', distinct=True))
+        )
+
+    def count_teacher(self, queryset):
+        return {
+            str(teacher_id): count
+            for teacher_id, count in queryset.values_list('teachers').exclude(teachers=None)
+            .annotate(count=Count('id'))
+        }
@@ -1,5 +1,10 @@
+import datetime
+from collections import defaultdict
+from django.utils import timezone
 from rest_framework import serializers
 from apps.courses.models import Course, Schedule, Enrollment
+from apps.courses.enrollment import ENROLLED
+from apps.courses.occurrences import MAX_WINDOW_DAYS, iter_occurrences
 
 class ScheduleSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,7 +21,152 @@ class CourseSerializer(serializers.ModelSerializer):
             'teachers', 'node', 'is_active', 'image', 'schedules'
         ]
 
+class CourseRowSerializer:
+    """
+    Read-only fast path of CourseSerializer working on ``values()`` rows.
+
+    Produces exactly the same representation as CourseSerializer, but
+    without instantiating models nor one serializer field per value:
+    schedules and teachers of all the rows are fetched with one query each.
+    """
+    COURSE_FIELDS = (
+        'id', 'name', 'slug', 'description', 'style_id', 'level_id',
+        'node_id', 'is_active', 'image'
+    )
+    SCHEDULE_FIELDS = ('id', 'course_id', 'day_of_week', 'start_time', 'end_time', 'location_name')
+
+    def __init__(self, rows, context=None):
+        self.rows = list(rows)
+        self.context = context or {}
+
+    def image_url(self, name):
+        if not name:
+            return None
+        url = Course._meta.get_field('image').storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def load_schedules(self, course_ids):
+        schedules = defaultdict(list)
+        rows = Schedule.objects.filter(course_id__in=course_ids).order_by(
+            'day_of_week', 'start_time'
+        ).values_list(*self.SCHEDULE_FIELDS)
+        for schedule_id, course_id, day_of_week, start_time, end_time, location_name in rows:
+            schedules[course_id].append({
+                'id': str(schedule_id),
+                'day_of_week': day_of_week,
+                'start_time': start_time.isoformat(),
+                'end_time': end_time.isoformat(),
+                'location_name': location_name,
+            })
+        return schedules
+
+    def load_teachers(self, course_ids):
+        teachers = defaultdict(list)
+        # Same order as course.teachers.all() (User.Meta.ordering)
+        rows = Course.teachers.through.objects.filter(course_id__in=course_ids).order_by(
+            '-user__created_at'
+        ).values_list('course_id', 'user_id')
+        for course_id, user_id in rows:
+            teachers[course_id].append(str(user_id))
+        return teachers
+
+    @property
+    def data(self):
+        if not self.rows:
+            return []
+        course_ids = [row['id'] for row in self.rows]
+        schedules = self.load_schedules(course_ids)
+        teachers = self.load_teachers(course_ids)
+        return [{
+            'id': str(row['id']),
+            'name': row['name'],
+            'slug': row['slug'],
+            'description': row['description'],
+            'style': str(row['style_id']),
+            'level': str(row['level_id']),
+            'teachers': teachers.get(row['id'], []),
+            'node': str(row['node_id']),
+            'is_active': row['is_active'],
+            'image': self.image_url(row['image']),
+            'schedules': schedules.get(row['id'], []),
+        } for row in self.rows]
+
+class SessionWindowQuerySerializer(serializers.Serializer):
+    """
+    Paramètres ``?start=`` et ``?end=`` (dates incluses, AAAA-MM-JJ) des
+    séances d'un cours. Par défaut : les 8 semaines à venir.
+    """
+    DEFAULT_DAYS = 55
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start = attrs.get('start') or timezone.localdate()
+        end = attrs.get('end') or start + datetime.timedelta(days=self.DEFAULT_DAYS)
+        if end < start:
+            raise serializers.ValidationError({'end': "La fin doit être postérieure au début."})
+        if (end - start).days > MAX_WINDOW_DAYS:
+            raise serializers.ValidationError({'end': f"Fenêtre limitée à {MAX_WINDOW_DAYS} jours."})
+        return {'start': start, 'end': end}
+
 class EnrollmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Enrollment
-        fields = ['id', 'user', 'course', 'enrolled_at', 'is_active']
+        fields = [
+            'id', 'user', 'course', 'enrolled_at', 'is_active', 'status', 'waitlisted_at',
+            'attendance_recorded', 'attendance_present', 'attendance_rate'
+        ]
+        # Admission (status, waitlist) is decided by apps.courses.enrollment
+        read_only_fields = ['user', 'is_active', 'status', 'waitlisted_at']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            # Moving an enrollment would bypass the seat counters of both courses
+            fields['course'].read_only = True
+        return fields
+
+class AttendanceMarkSerializer(serializers.Serializer):
+    enrollment = serializers.UUIDField()
+    is_present = serializers.BooleanField(default=True)
+
+class AttendanceSheetSerializer(serializers.Serializer):
+    """
+    Feuille de présence d'une séance (horaire + date) d'un cours, passé
+    dans le contexte (``course``). ``all_present`` marque présents tous les
+    inscrits ; ``marks`` précise (ou corrige) la présence d'élèves.
+    """
+    schedule = serializers.UUIDField()
+    session_date = serializers.DateField()
+    all_present = serializers.BooleanField(default=False)
+    marks = AttendanceMarkSerializer(many=True, required=False)
+
+    def validate(self, attrs):
+        course = self.context['course']
+        schedule = Schedule.objects.filter(pk=attrs['schedule'], course=course).first()
+        if schedule is None:
+            raise serializers.ValidationError({'schedule': "Horaire introuvable pour ce cours."})
+        session_date = attrs['session_date']
+        if session_date > timezone.localdate():
+            raise serializers.ValidationError({'session_date': "Impossible de faire l'appel d'une séance à venir."})
+        if session_date.weekday() != schedule.day_of_week:
+            raise serializers.ValidationError({'session_date': "La date ne correspond pas au jour de l'horaire."})
+        # Holidays and sessions cancelled by a ScheduleException have no session
+        if next(iter_occurrences([schedule.as_slot()], session_date, session_date), None) is None:
+            raise serializers.ValidationError({'session_date': "Aucune séance n'a lieu à cette date (vacances ou séance annulée)."})
+
+        enrolled = set(Enrollment.objects.filter(course=course, status=ENROLLED).values_list('pk', flat=True))
+        marks = dict.fromkeys(enrolled, True) if attrs['all_present'] else {}
+        unknown = []
+        for mark in attrs.get('marks', []):
+            if mark['enrollment'] not in enrolled:
+                unknown.append(str(mark['enrollment']))
+            marks[mark['enrollment']] = mark['is_present']
+        if unknown:
+            raise serializers.ValidationError({'marks': [f"Inscription inconnue pour ce cours : {', '.join(unknown)}."]})
+        if not marks:
+            raise serializers.ValidationError({'marks': ["Aucune présence à enregistrer."]})
+        attrs['marks'] = marks
+        return attrs
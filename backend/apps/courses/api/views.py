@@ -1,17 +1,151 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from apps.courses.attendance import record_attendance
+from apps.courses.enrollment import cancel, enroll
 from apps.courses.models import Course, Enrollment
-from .serializers import CourseSerializer, EnrollmentSerializer
+from apps.courses.occurrences import course_calendar_payload, course_sessions_payload
+from apps.courses.planning import filter_planning, planning_etag, planning_grid
+from .filters import CourseFilter
+from .serializers import (
+    AttendanceSheetSerializer, CourseRowSerializer, CourseSerializer, EnrollmentSerializer, SessionWindowQuerySerializer
+)
 
 class CourseViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Course.objects.filter(is_active=True)
+    """
+    Active courses. List and detail are read as ``values()`` rows and
+    serialized by CourseRowSerializer: a constant number of queries (count,
+    page, schedules, teachers) whatever the page size.
+
+    The paginated list also carries ``facets``: course counts per style,
+    level, node, day and teacher for the current filters (see CourseFilter).
+    """
+    queryset = Course.objects.filter(is_active=True).prefetch_related('schedules', 'teachers').order_by('name', 'id')
     serializer_class = CourseSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
+    filterset_class = CourseFilter
+
+    def get_rows(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset.prefetch_related(None).values(*CourseRowSerializer.COURSE_FIELDS)
+
+    def list(self, request, *args, **kwargs):
+        rows = self.get_rows()
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            serializer = CourseRowSerializer(page, context=self.get_serializer_context())
+            response = self.get_paginated_response(serializer.data)
+            response.data['facets'] = CourseFilter(
+                request.query_params, queryset=self.get_queryset().prefetch_related(None), request=request
+            ).get_facets()
+            return response
+        serializer = CourseRowSerializer(rows, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        slug = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        rows = CourseRowSerializer(
+            self.get_rows().filter(slug=slug)[:1], context=self.get_serializer_context()
+        ).data
+        if not rows:
+            raise Http404
+        return Response(rows[0])
+
+    @action(detail=False, methods=['get'], url_path='planning')
+    @method_decorator(condition(etag_func=planning_etag))
+    def planning(self, request):
+        """
+        Weekly timetable: one entry per day, with its schedules sorted by
+        start time and the course, style, level, node and location inlined.
+        Served from a cached grid; ``?node=<slug>`` (whole branch) and
+        ``?style=<slug>`` (sub-styles included) filter the cached grid.
+        """
+        days = filter_planning(
+            planning_grid(),
+            node=request.query_params.get('node') or None,
+            style=request.query_params.get('style') or None,
+        )
+        return Response(days)
+
+    def get_session_window(self):
+        params = SessionWindowQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data['start'], params.validated_data['end']
+
+    @action(detail=True, methods=['get'], url_path='sessions')
+    def sessions(self, request, slug=None):
+        """
+        Dated sessions of the course between ``?start=`` and ``?end=``
+        (default: the next 8 weeks), holidays and cancelled sessions removed.
+        """
+        course_id = get_object_or_404(Course.objects.filter(is_active=True).values_list('id', flat=True), slug=slug)
+        start, end = self.get_session_window()
+        return Response(course_sessions_payload(course_id, start, end))
+
+    @action(detail=True, methods=['get'], url_path='calendar')
+    def calendar(self, request, slug=None):
+        """iCalendar (.ics) export of the sessions, same window as ``sessions``."""
+        course = get_object_or_404(Course.objects.filter(is_active=True).only('id', 'name'), slug=slug)
+        start, end = self.get_session_window()
+        response = HttpResponse(
+            course_calendar_payload(course.pk, course.name, start, end),
+            content_type='text/calendar; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{slug}.ics"'
+        return response
+
+    @action(detail=True, methods=['post'], url_path='attendance', permission_classes=[permissions.IsAuthenticated])
+    def attendance(self, request, slug=None):
+        """
+        Bulk check-in of one session, by a teacher of the course (or staff).
+
+        Body: ``{"schedule": id, "session_date": "YYYY-MM-DD",
+        "all_present": true, "marks": [{"enrollment": id, "is_present": false}]}``.
+        Returns the number of records and the updated attendance rate of the course.
+        """
+        course = get_object_or_404(Course.objects.filter(is_active=True), slug=slug)
+        if not request.user.is_staff and not course.teachers.filter(pk=request.user.pk).exists():
+            raise PermissionDenied("Seuls les professeurs du cours peuvent faire l'appel.")
+        sheet = AttendanceSheetSerializer(data=request.data, context={'course': course})
+        sheet.is_valid(raise_exception=True)
+        recorded = record_attendance(
+            course, sheet.validated_data['schedule'], sheet.validated_data['session_date'],
+            sheet.validated_data['marks']
+        )
+        course.refresh_from_db(fields=['attendance_recorded', 'attendance_present'])
+        return Response({'recorded': recorded, 'attendance_rate': course.attendance_rate})
 
 class EnrollmentViewSet(viewsets.ModelViewSet):
+    """
+    Course enrollments. Creating one takes a seat if the course has one left
+    (``status`` ENROLLED), otherwise joins the waitlist (WAITLISTED).
+    Deleting an enrollment cancels it and promotes the next waitlisted one.
+    Students only see their own enrollments, staff see all of them; the
+    course of an enrollment cannot be changed.
+    """
     queryset = Enrollment.objects.all()
     serializer_class = EnrollmentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        try:
+            serializer.instance = enroll(self.request.user, serializer.validated_data['course'])
+        except DjangoValidationError as exc:
+            raise ValidationError({'course': exc.messages})
+
+    def perform_destroy(self, instance):
+        # Kept as CANCELLED so the course counter and the waitlist stay consistent
+        cancel(instance)
@@ -5,3 +5,6 @@ class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.courses'
     verbose_name = 'Cours'
+
+    def ready(self):
+        from apps.courses import signals  # noqa: F401
@@ -0,0 +1,75 @@
+"""
+Attendance check-in per session, with incrementally maintained rates.
+
+A whole class is written with one ``bulk_create`` upserting on
+(enrollment, schedule, session_date). The attendance totals of each
+Enrollment and of the Course are then adjusted by the difference with the
+previous marks of the session, so rates never require scanning the
+Attendance table.
+"""
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from apps.courses.models import Attendance, Course, Enrollment
+
+
+def _increments(deltas):
+    """``Case`` adding ``deltas[pk]`` to a counter, per enrollment pk."""
+    return Case(
+        *(When(pk=pk, then=Value(delta)) for pk, delta in deltas.items() if delta),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def record_attendance(course, schedule_id, session_date, marks):
+    """
+    Record the presence of the students of one session.
+
+    ``marks`` maps an enrollment id to ``True`` (present) or ``False``.
+    Marking a student twice updates the record and only the change is
+    counted. Returns the number of records written.
+    """
+    if not marks:
+        return 0
+    with transaction.atomic():
+        # Serializes check-ins of the same course: the previous marks read
+        # below cannot change until the counters are updated
+        Course.objects.select_for_update().filter(pk=course.pk).first()
+
+        previous = dict(Attendance.objects.filter(
+            schedule_id=schedule_id, session_date=session_date, enrollment_id__in=list(marks)
+        ).values_list('enrollment_id', 'is_present'))
+
+        recorded = {}
+        present = {}
+        for enrollment_id, is_present in marks.items():
+            if enrollment_id not in previous:
+                recorded[enrollment_id] = 1
+                present[enrollment_id] = int(is_present)
+            elif previous[enrollment_id] != is_present:
+                present[enrollment_id] = 1 if is_present else -1
+
+        Attendance.objects.bulk_create(
+            [
+                Attendance(
+                    enrollment_id=enrollment_id, schedule_id=schedule_id,
+                    session_date=session_date, is_present=is_present,
+                )
+                for enrollment_id, is_present in marks.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['enrollment', 'schedule', 'session_date'],
+            update_fields=['is_present', 'updated_at'],
+        )
+
+        if any(recorded.values()) or any(present.values()):
+            Enrollment.objects.filter(pk__in=set(recorded) | set(present)).update(
+                attendance_recorded=F('attendance_recorded') + _increments(recorded),
+                attendance_present=F('attendance_present') + _increments(present),
+            )
+            Course.objects.filter(pk=course.pk).update(
+                attendance_recorded=F('attendance_recorded') + sum(recorded.values()),
+                attendance_present=F('attendance_present') + sum(present.values()),
+            )
+    return len(marks)
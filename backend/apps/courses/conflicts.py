@@ -0,0 +1,154 @@
+"""
+Double-booking detection for the weekly schedules.
+
+Two schedules conflict when they overlap on the same day of the week and
+share a teacher (through ``Course.teachers``) or a location. Schedules are
+grouped per (teacher or location, day), then each group is swept once in
+start time order, keeping the running intervals in a heap ordered by end
+time: O(n log n + k) for n schedules and k conflicts, instead of comparing
+every pair.
+"""
+import heapq
+from collections import defaultdict, namedtuple
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from apps.courses.models import Course, Schedule, location_key
+
+User = get_user_model()
+
+Slot = namedtuple('Slot', 'id course_id day_of_week start_time end_time location_name')
+
+Conflict = namedtuple('Conflict', 'kind resource day_of_week first second')
+
+TEACHER = 'teacher'
+LOCATION = 'location'
+
+SLOT_FIELDS = ('id', 'course_id', 'day_of_week', 'start_time', 'end_time', 'location_name')
+
+
+def find_overlaps(slots):
+    """
+    Yield every pair of overlapping slots of one group, in start time order.
+
+    Touching slots (one ends when the other starts) do not overlap.
+    """
+    running = []
+    for index, slot in enumerate(sorted(slots, key=lambda slot: (slot.start_time, slot.end_time))):
+        while running and running[0][0] <= slot.start_time:
+            heapq.heappop(running)
+        for _, _, other in running:
+            yield other, slot
+        heapq.heappush(running, (slot.end_time, index, slot))
+
+
+def find_conflicts(slots, teachers_by_course):
+    """
+    Return the conflicts between ``slots`` (an iterable of Slot).
+
+    ``teachers_by_course`` maps a course id to the ids of its teachers.
+    """
+    groups = defaultdict(list)
+    for slot in slots:
+        if slot.location_name.strip():
+            groups[LOCATION, location_key(slot.location_name), slot.day_of_week].append(slot)
+        for teacher_id in teachers_by_course.get(slot.course_id, ()):
+            groups[TEACHER, teacher_id, slot.day_of_week].append(slot)
+
+    conflicts = []
+    for (kind, resource, day_of_week), group in groups.items():
+        if len(group) < 2:
+            continue
+        for first, second in find_overlaps(group):
+            conflicts.append(Conflict(kind, resource, day_of_week, first, second))
+    conflicts.sort(key=lambda conflict: (conflict.day_of_week, conflict.first.start_time, conflict.kind))
+    return conflicts
+
+
+def load_teachers(course_ids=None):
+    """``{course_id: {teacher_id, ...}}``, in one query."""
+    rows = Course.teachers.through.objects.all()
+    if course_ids is not None:
+        rows = rows.filter(course_id__in=course_ids)
+    teachers = defaultdict(set)
+    for course_id, user_id in rows.values_list('course_id', 'user_id'):
+        teachers[course_id].add(user_id)
+    return teachers
+
+
+def audit_conflicts(include_inactive=False):
+    """Every conflict across the schedules of the (active) courses, in two queries."""
+    schedules = Schedule.objects.all()
+    if not include_inactive:
+        schedules = schedules.filter(course__is_active=True)
+    slots = [Slot(*row) for row in schedules.values_list(*SLOT_FIELDS)]
+    return find_conflicts(slots, load_teachers())
+
+
+def conflicts_for(slots, course, teacher_ids):
+    """
+    Conflicts between ``slots`` (the schedules of ``course`` being edited)
+    and the schedules of the other active courses.
+
+    ``teacher_ids`` are the teachers of ``course``; only the schedules of
+    the same days sharing a teacher or a location are read.
+    """
+    slots = list(slots)
+    if not slots:
+        return []
+    teacher_ids = set(teacher_ids)
+
+    shared = Q(course__teachers__in=teacher_ids) if teacher_ids else Q()
+    location_keys = {location_key(slot.location_name) for slot in slots if slot.location_name.strip()}
+    if location_keys:
+        # Same normalized key as the groups of find_conflicts()
+        shared |= Q(location_key__in=location_keys)
+    if not shared:
+        return []
+    others = Schedule.objects.filter(
+        shared, course__is_active=True, day_of_week__in={slot.day_of_week for slot in slots}
+    ).exclude(course_id=course.pk).distinct()
+    other_slots = [Slot(*row) for row in others.values_list(*SLOT_FIELDS)]
+
+    teachers = load_teachers({slot.course_id for slot in other_slots})
+    teachers[course.pk] = teacher_ids
+    own = {slot.id for slot in slots}
+    return [
+        conflict for conflict in find_conflicts(slots + other_slots, teachers)
+        if (conflict.first.id in own) != (conflict.second.id in own)
+    ]
+
+
+def describe_conflicts(conflicts):
+    """Human readable messages (French) for a list of conflicts."""
+    if not conflicts:
+        return []
+    course_names = dict(Course.objects.filter(
+        id__in={slot.course_id for conflict in conflicts for slot in (conflict.first, conflict.second)}
+    ).values_list('id', 'name'))
+    teacher_names = {
+        user.pk: user.get_full_name() or user.username
+        for user in User.objects.filter(
+            pk__in={conflict.resource for conflict in conflicts if conflict.kind == TEACHER}
+        ).only('username', 'first_name', 'last_name')
+    }
+    days = dict(Schedule.DAYS)
+
+    def label(slot):
+        return (
+            f"« {course_names.get(slot.course_id, 'ce cours')} » "
+            f"{slot.start_time:%H:%M}-{slot.end_time:%H:%M}"
+        )
+
+    messages = []
+    for conflict in conflicts:
+        if conflict.kind == TEACHER:
+            resource = f"professeur {teacher_names.get(conflict.resource, conflict.resource)}"
+        else:
+            resource = f"salle « {conflict.first.location_name.strip()} »"
+        messages.append(
+            f"{days[conflict.day_of_week]} : {label(conflict.first)} et {label(conflict.second)} "
+            f"se chevauchent ({resource})."
+        )
+    return messages
@@ -0,0 +1,120 @@
+"""
+Course admission with capacity and waitlist.
+
+A seat is taken with one conditional ``UPDATE``:
+
+    UPDATE course SET enrolled_count = enrolled_count + 1
+    WHERE id = ... AND (capacity IS NULL OR enrolled_count < capacity)
+
+The database evaluates the condition and the increment atomically on the
+row (PostgreSQL re-checks it after waiting for a concurrent writer, SQLite
+serializes writers), so concurrent requests can never admit more students
+than ``capacity``, without holding a lock around the rest of the request.
+Requests that do not get a seat join the waitlist, which is promoted in
+arrival order whenever a seat is released.
+"""
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.courses.models import Course, Enrollment
+
+ENROLLED = 'ENROLLED'
+WAITLISTED = 'WAITLISTED'
+CANCELLED = 'CANCELLED'
+
+ALREADY_ENROLLED = "Vous êtes déjà inscrit(e) à ce cours ou sur sa liste d'attente."
+
+
+def take_seat(course_id):
+    """Take one seat of the course if one is left; return whether it was taken."""
+    return Course.objects.filter(
+        Q(capacity__isnull=True) | Q(enrolled_count__lt=F('capacity')), pk=course_id
+    ).update(enrolled_count=F('enrolled_count') + 1) == 1
+
+
+def release_seat(course_id):
+    Course.objects.filter(pk=course_id, enrolled_count__gt=0).update(
+        enrolled_count=F('enrolled_count') - 1
+    )
+
+
+def enroll(user, course):
+    """
+    Enroll ``user`` in ``course``, or put them on the waitlist when the
+    course is full (or when others are already waiting).
+
+    A cancelled enrollment is reused. Raises ValidationError when the user
+    is already enrolled or waitlisted.
+    """
+    try:
+        with transaction.atomic():
+            enrollment = Enrollment.objects.filter(user=user, course=course).first()
+            if enrollment is not None and enrollment.status != CANCELLED:
+                raise ValidationError(ALREADY_ENROLLED)
+
+            # Nobody may skip the queue, even if a seat was just released
+            waiting = Enrollment.objects.filter(course=course, status=WAITLISTED).exists()
+            if not waiting and take_seat(course.pk):
+                changes = dict(status=ENROLLED, waitlisted_at=None, is_active=True)
+            else:
+                changes = dict(status=WAITLISTED, waitlisted_at=timezone.now(), is_active=True)
+
+            if enrollment is None:
+                enrollment = Enrollment.objects.create(user=user, course=course, **changes)
+            elif Enrollment.objects.filter(pk=enrollment.pk, status=CANCELLED).update(
+                updated_at=timezone.now(), **changes
+            ):
+                enrollment.refresh_from_db()
+            else:
+                # Re-enrolled by a concurrent request: roll the seat back
+                raise ValidationError(ALREADY_ENROLLED)
+    except IntegrityError:
+        # Concurrent request of the same user: the seat taken above was rolled back
+        raise ValidationError(ALREADY_ENROLLED)
+    return enrollment
+
+
+def cancel(enrollment):
+    """
+    Cancel an enrollment; a released seat goes to the first waitlisted
+    student. Returns the promoted enrollments.
+    """
+    changes = dict(status=CANCELLED, is_active=False, waitlisted_at=None, updated_at=timezone.now())
+    with transaction.atomic():
+        # Only the request that actually changes the status releases the seat
+        released = Enrollment.objects.filter(pk=enrollment.pk, status=ENROLLED).update(**changes)
+        if not released:
+            Enrollment.objects.filter(pk=enrollment.pk, status=WAITLISTED).update(**changes)
+        enrollment.refresh_from_db(fields=list(changes))
+        if released:
+            release_seat(enrollment.course_id)
+            return promote_waitlist(enrollment.course_id)
+    return []
+
+
+def promote_waitlist(course_id):
+    """
+    Give the free seats of a course to the waitlist, in arrival order
+    (after a cancellation or a capacity increase). Returns the promoted
+    enrollments.
+    """
+    promoted = []
+    with transaction.atomic():
+        while True:
+            candidate = Enrollment.objects.filter(
+                course_id=course_id, status=WAITLISTED
+            ).order_by('waitlisted_at', 'id').first()
+            if candidate is None or not take_seat(course_id):
+                break
+            # The candidate may have cancelled in the meantime
+            if Enrollment.objects.filter(pk=candidate.pk, status=WAITLISTED).update(
+                status=ENROLLED, waitlisted_at=None, updated_at=timezone.now()
+            ):
+                candidate.status = ENROLLED
+                candidate.waitlisted_at = None
+                promoted.append(candidate)
+            else:
+                release_seat(course_id)
+    return promoted
@@ -0,0 +1,63 @@
+"""
+Minimal iCalendar (RFC 5545) rendering of course sessions.
+"""
+import datetime
+
+from django.utils import timezone
+
+PRODID = '-//Capital of Fusion//Cours//FR'
+
+
+def escape(text):
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Fold a content line at 75 octets, as required by the RFC."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return encoded + b'\r\n'
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut])
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return b'\r\n '.join(parts) + b'\r\n'
+
+
+def format_utc(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def iter_ics(occurrences, course_names, name="Cours", url=None):
+    """
+    Yield an iCalendar document, one line at a time, for an iterable of
+    Occurrence. ``course_names`` maps a course id to the event summary.
+    """
+    stamp = format_utc(timezone.now())
+    yield fold('BEGIN:VCALENDAR')
+    yield fold('VERSION:2.0')
+    yield fold(f'PRODID:{PRODID}')
+    yield fold('CALSCALE:GREGORIAN')
+    yield fold(f'X-WR-CALNAME:{escape(name)}')
+    for occurrence in occurrences:
+        yield fold('BEGIN:VEVENT')
+        yield fold(f'UID:{occurrence.schedule_id}-{occurrence.date:%Y%m%d}@capitaloffusion')
+        yield fold(f'DTSTAMP:{stamp}')
+        yield fold(f'DTSTART:{format_utc(occurrence.start)}')
+        yield fold(f'DTEND:{format_utc(occurrence.end)}')
+        yield fold(f'SUMMARY:{escape(course_names.get(occurrence.course_id, name))}')
+        if occurrence.location_name:
+            yield fold(f'LOCATION:{escape(occurrence.location_name)}')
+        if url:
+            yield fold(f'URL:{url}')
+        yield fold('END:VEVENT')
+    yield fold('END:VCALENDAR')
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.conflicts import audit_conflicts, describe_conflicts
+
+
+class Command(BaseCommand):
+    help = "List every schedule double-booking a teacher or a location."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--include-inactive',
+            action='store_true',
+            help="Also check the schedules of inactive courses.",
+        )
+        parser.add_argument(
+            '--fail',
+            action='store_true',
+            help="Exit with an error when conflicts are found (for CI / cron).",
+        )
+
+    def handle(self, *args, **options):
+        conflicts = audit_conflicts(include_inactive=options['include_inactive'])
+        for message in describe_conflicts(conflicts):
+            self.stdout.write(message)
+
+        if not conflicts:
+            self.stdout.write(self.style.SUCCESS("Aucun conflit d'horaire."))
+        elif options['fail']:
+            raise CommandError(f"{len(conflicts)} conflit(s) d'horaire.")
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(conflicts)} conflit(s) d'horaire."))
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.utils import timezone
+
+from apps.core.models import DanceStyle, Level
+from apps.courses.enrollment import CANCELLED, ENROLLED, WAITLISTED, cancel, enroll
+from apps.courses.models import Course, Enrollment
+from apps.organization.models import OrganizationNode
+
+User = get_user_model()
+
+RETRIES = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Enroll many students in parallel into a throwaway course and check "
+        "that its capacity is never exceeded (to run against a staging database)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--capacity', type=int, default=10, help="Capacity of the throwaway course.")
+        parser.add_argument('--students', type=int, default=60, help="Number of parallel students.")
+        parser.add_argument(
+            '--cancel-every',
+            type=int,
+            default=5,
+            help="One student out of N cancels right after enrolling (0 = never).",
+        )
+
+    def handle(self, *args, **options):
+        capacity, students = options['capacity'], options['students']
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                "SQLite sérialise les écritures : des « database is locked » sont attendus."
+            ))
+        style, level, node = DanceStyle.objects.first(), Level.objects.first(), OrganizationNode.objects.first()
+        if style is None or level is None or node is None:
+            raise CommandError("Il faut au moins un style, un niveau et un nœud pour le cours de test.")
+
+        stamp = f'{timezone.now():%Y%m%d%H%M%S%f}'
+        course = Course.objects.create(
+            name="Stress test inscriptions", slug=f'stress-test-inscriptions-{stamp}',
+            style=style, level=level, node=node, capacity=capacity, is_active=False,
+        )
+        users = User.objects.bulk_create([
+            User(username=f'stress-{stamp}-{index}', is_active=False) for index in range(students)
+        ])
+        outcomes = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(students)
+
+        def join(index):
+            barrier.wait()
+            outcome = 'db_error'
+            try:
+                # Lock errors (SQLite) are retried, like a client would
+                for attempt in range(RETRIES):
+                    try:
+                        enrollment = enroll(users[index], course)
+                        outcome = enrollment.status
+                        if options['cancel_every'] and index % options['cancel_every'] == 0:
+                            cancel(enrollment)
+                            outcome = CANCELLED
+                        break
+                    except ValidationError:
+                        outcome = 'refused'
+                        break
+                    except OperationalError:
+                        time.sleep(0.05 * (attempt + 1))
+            finally:
+                connections.close_all()
+            with lock:
+                outcomes[outcome] += 1
+
+        try:
+            threads = [threading.Thread(target=join, args=(index,)) for index in range(students)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            course.refresh_from_db()
+            statuses = Counter(Enrollment.objects.filter(course=course).values_list('status', flat=True))
+            self.stdout.write(
+                f"Inscrits : {outcomes[ENROLLED]}, en attente : {outcomes[WAITLISTED]}, "
+                f"annulés : {outcomes[CANCELLED]}, erreurs base : {outcomes['db_error']}"
+            )
+            self.stdout.write(
+                f"En base : {statuses[ENROLLED]} inscrit(s), {statuses[WAITLISTED]} en attente, "
+                f"compteur {course.enrolled_count} / {capacity}"
+            )
+            if statuses[ENROLLED] > capacity or statuses[ENROLLED] != course.enrolled_count:
+                raise CommandError("Capacité dépassée ou compteur incohérent.")
+            if statuses[ENROLLED] < capacity and statuses[WAITLISTED]:
+                raise CommandError("Des places sont libres alors que des élèves attendent.")
+            self.stdout.write(self.style.SUCCESS("Capacité respectée."))
+        finally:
+            course.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
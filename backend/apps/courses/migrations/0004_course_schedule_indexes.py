@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-17 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0003_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                fields=["is_active", "style", "level"],
+                name="course_active_style_level_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="schedule",
+            index=models.Index(
+                fields=["course", "day_of_week", "start_time"],
+                name="schedule_course_day_start_idx",
+            ),
+        ),
+    ]
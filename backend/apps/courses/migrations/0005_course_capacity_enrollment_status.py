@@ -0,0 +1,67 @@
+# Generated by Django 5.0.1 on 2026-10-17 20:01
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def init_enrollment_state(apps, schema_editor):
+    Course = apps.get_model("courses", "Course")
+    Enrollment = apps.get_model("courses", "Enrollment")
+    Enrollment.objects.filter(is_active=False).update(status="CANCELLED")
+
+    courses = Course.objects.annotate(
+        active_count=Count("students", filter=Q(students__status="ENROLLED"))
+    ).filter(active_count__gt=0)
+    for course in courses:
+        course.enrolled_count = course.active_count
+    Course.objects.bulk_update(courses, ["enrolled_count"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0004_course_schedule_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="capacity",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Nombre maximum d'élèves inscrits (vide = illimité)",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="enrolled_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="enrollment",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("ENROLLED", "Inscrit"),
+                    ("WAITLISTED", "Liste d'attente"),
+                    ("CANCELLED", "Annulé"),
+                ],
+                default="ENROLLED",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="enrollment",
+            name="waitlisted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(
+                fields=["course", "status", "waitlisted_at"],
+                name="enrollment_waitlist_idx",
+            ),
+        ),
+        migrations.RunPython(init_enrollment_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.0.1 on 2026-10-17 20:40
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0005_course_capacity_enrollment_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Holiday",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=200)),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+            ],
+            options={
+                "verbose_name": "Vacances / jour férié",
+                "verbose_name_plural": "Vacances / jours fériés",
+                "ordering": ["start_date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ScheduleException",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "date",
+                    models.DateField(help_text="Date de la séance concernée"),
+                ),
+                (
+                    "is_cancelled",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Séance annulée (sinon : séance modifiée)",
+                    ),
+                ),
+                (
+                    "start_time",
+                    models.TimeField(
+                        blank=True,
+                        help_text="Nouvelle heure de début (vide = inchangée)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "end_time",
+                    models.TimeField(
+                        blank=True,
+                        help_text="Nouvelle heure de fin (vide = inchangée)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "location_name",
+                    models.CharField(
+                        blank=True,
+                        help_text="Nouveau lieu (vide = inchangé)",
+                        max_length=200,
+                    ),
+                ),
+                ("reason", models.CharField(blank=True, max_length=200)),
+                (
+                    "schedule",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exceptions",
+                        to="courses.schedule",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Exception d'horaire",
+                "verbose_name_plural": "Exceptions d'horaire",
+                "unique_together": {("schedule", "date")},
+            },
+        ),
+    ]
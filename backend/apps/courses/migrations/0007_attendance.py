@@ -0,0 +1,80 @@
+# Generated by Django 5.0.1 on 2026-10-17 21:05
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0006_holiday_scheduleexception"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="attendance_present",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="attendance_recorded",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="enrollment",
+            name="attendance_present",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="enrollment",
+            name="attendance_recorded",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name="Attendance",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("session_date", models.DateField()),
+                ("is_present", models.BooleanField(default=True)),
+                (
+                    "enrollment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendances",
+                        to="courses.enrollment",
+                    ),
+                ),
+                (
+                    "schedule",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendances",
+                        to="courses.schedule",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Présence",
+                "verbose_name_plural": "Présences",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="attendance",
+            constraint=models.UniqueConstraint(
+                fields=("enrollment", "schedule", "session_date"),
+                name="attendance_unique_session",
+            ),
+        ),
+    ]
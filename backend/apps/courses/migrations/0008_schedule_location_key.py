@@ -0,0 +1,39 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+# Frozen copy of apps.courses.models.location_key
+def location_key(location_name):
+    return " ".join(location_name.split()).casefold()
+
+
+def fill_location_keys(apps, schema_editor):
+    Schedule = apps.get_model("courses", "Schedule")
+    schedules = list(Schedule.objects.only("id", "location_name"))
+    for schedule in schedules:
+        schedule.location_key = location_key(schedule.location_name)
+    Schedule.objects.bulk_update(schedules, ["location_key"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0007_attendance"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="schedule",
+            name="location_key",
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name="schedule",
+            index=models.Index(
+                fields=["location_key", "day_of_week"],
+                name="schedule_location_day_idx",
+            ),
+        ),
+        migrations.RunPython(fill_location_keys, migrations.RunPython.noop),
+    ]
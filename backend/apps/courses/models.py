@@ -1,7 +1,28 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from apps.core.models import BaseModel
 
-class Course(BaseModel):
+def location_key(location_name):
+    """Locations are compared case- and whitespace-insensitively."""
+    return ' '.join(location_name.split()).casefold()
+
+class CounterFieldsMixin:
+    """
+    The fields listed in ``COUNTER_FIELDS`` are only written with conditional
+    or F() updates (apps.courses.enrollment, apps.courses.attendance):
+    save() of a loaded instance never overwrites them with stale values.
+    """
+    COUNTER_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+class Course(CounterFieldsMixin, BaseModel):
     name = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
@@ -13,13 +34,35 @@ class Course(BaseModel):
     is_active = models.BooleanField(default=True)
     image = models.ImageField(upload_to='courses/', blank=True, null=True)
 
+    capacity = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text="Nombre maximum d'élèves inscrits (vide = illimité)"
+    )
+    # Seats taken, maintained by apps.courses.enrollment with conditional updates
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)
+    # Attendance totals over all enrollments, maintained by apps.courses.attendance
+    attendance_recorded = models.PositiveIntegerField(default=0, editable=False)
+    attendance_present = models.PositiveIntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = ('enrolled_count', 'attendance_recorded', 'attendance_present')
+
     class Meta:
         verbose_name = "Cours"
         verbose_name_plural = "Cours"
+        indexes = [
+            # Catalog filters: active courses by style and level
+            models.Index(fields=['is_active', 'style', 'level'], name='course_active_style_level_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def attendance_rate(self):
+        if not self.attendance_recorded:
+            return None
+        return self.attendance_present / self.attendance_recorded
+
 class Schedule(BaseModel):
     DAYS = (
         (0, 'Lundi'), (1, 'Mardi'), (2, 'Mercredi'), (3, 'Jeudi'),
@@ -30,16 +73,137 @@ class Schedule(BaseModel):
     start_time = models.TimeField()
     end_time = models.TimeField()
     location_name = models.CharField(max_length=200)
+    # location_key(location_name), kept by save(): double-booking checks
+    # compare locations on it, at save time and in the audit alike
+    location_key = models.CharField(max_length=200, blank=True, editable=False)
     
     class Meta:
         verbose_name = "Horaire"
         verbose_name_plural = "Horaires"
+        indexes = [
+            # Day / time-of-day filters, evaluated per course
+            models.Index(fields=['course', 'day_of_week', 'start_time'], name='schedule_course_day_start_idx'),
+            # Schedules sharing a location (conflicts_for)
+            models.Index(fields=['location_key', 'day_of_week'], name='schedule_location_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.course} - {self.get_day_of_week_display()} {self.start_time:%H:%M}"
+
+    def save(self, *args, **kwargs):
+        self.location_key = location_key(self.location_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'location_name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'location_key'}
+        super().save(*args, **kwargs)
+
+    def as_slot(self):
+        from apps.courses.conflicts import Slot
+        return Slot(self.pk, self.course_id, self.day_of_week, self.start_time, self.end_time, self.location_name)
+
+    def clean(self):
+        super().clean()
+        if self.start_time and self.end_time and self.start_time >= self.end_time:
+            raise ValidationError({'end_time': "L'heure de fin doit être postérieure à l'heure de début."})
+        if self.course_id is None or self.day_of_week is None or not (self.start_time and self.end_time):
+            return
+
+        # Double-booking with the other courses; overlaps between the
+        # schedules of the same course are checked by the admin formset
+        from apps.courses.conflicts import conflicts_for, describe_conflicts
+        teacher_ids = [] if self.course._state.adding else self.course.teachers.values_list('pk', flat=True)
+        conflicts = conflicts_for([self.as_slot()], self.course, teacher_ids)
+        if conflicts:
+            raise ValidationError(describe_conflicts(conflicts))
+
+class ScheduleException(BaseModel):
+    """Séance d'un horaire annulée ou modifiée à une date donnée."""
+    schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name='exceptions')
+    date = models.DateField(help_text="Date de la séance concernée")
+    is_cancelled = models.BooleanField(default=True, help_text="Séance annulée (sinon : séance modifiée)")
+    start_time = models.TimeField(null=True, blank=True, help_text="Nouvelle heure de début (vide = inchangée)")
+    end_time = models.TimeField(null=True, blank=True, help_text="Nouvelle heure de fin (vide = inchangée)")
+    location_name = models.CharField(max_length=200, blank=True, help_text="Nouveau lieu (vide = inchangé)")
+    reason = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        verbose_name = "Exception d'horaire"
+        verbose_name_plural = "Exceptions d'horaire"
+        unique_together = ('schedule', 'date')
+
+    def __str__(self):
+        return f"{self.schedule.course} - {self.date}"
 
-class Enrollment(BaseModel):
+    def clean(self):
+        super().clean()
+        if self.schedule_id and self.date and self.date.weekday() != self.schedule.day_of_week:
+            raise ValidationError({'date': "La date ne correspond pas au jour de l'horaire."})
+
+class Holiday(BaseModel):
+    """Période sans cours (vacances, jour férié), bornes incluses."""
+    name = models.CharField(max_length=200)
+    start_date = models.DateField()
+    end_date = models.DateField()
+
+    class Meta:
+        verbose_name = "Vacances / jour férié"
+        verbose_name_plural = "Vacances / jours fériés"
+        ordering = ['start_date']
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        super().clean()
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            raise ValidationError({'end_date': "La date de fin doit être postérieure à la date de début."})
+
+class Enrollment(CounterFieldsMixin, BaseModel):
+    STATUS_CHOICES = (
+        ('ENROLLED', 'Inscrit'),
+        ('WAITLISTED', "Liste d'attente"),
+        ('CANCELLED', 'Annulé'),
+    )
     user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='enrollments')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='students')
     enrolled_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ENROLLED')
+    # Position in the waitlist: first come, first promoted
+    waitlisted_at = models.DateTimeField(null=True, blank=True)
+    # Attendance totals, maintained by apps.courses.attendance
+    attendance_recorded = models.PositiveIntegerField(default=0, editable=False)
+    attendance_present = models.PositiveIntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = ('attendance_recorded', 'attendance_present')
 
     class Meta:
         unique_together = ('user', 'course')
+        indexes = [
+            models.Index(fields=['course', 'status', 'waitlisted_at'], name='enrollment_waitlist_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.course}"
+
+    @property
+    def attendance_rate(self):
+        if not self.attendance_recorded:
+            return None
+        return self.attendance_present / self.attendance_recorded
+
+class Attendance(BaseModel):
+    """Présence d'un élève inscrit à une séance (horaire + date)."""
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.CASCADE, related_name='attendances')
+    schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name='attendances')
+    session_date = models.DateField()
+    is_present = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Présence"
+        verbose_name_plural = "Présences"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['enrollment', 'schedule', 'session_date'], name='attendance_unique_session'
+            ),
+        ]
@@ -0,0 +1,134 @@
+"""
+Expansion of the weekly schedules into dated sessions.
+
+Schedules only store a day of the week and times. Sessions of a date window
+are generated lazily, one week at a time per schedule, and merged in start
+order with ``heapq.merge``: a year of sessions is never materialized, and a
+consumer that stops early stops the generation too. Holidays remove every
+session of their dates; a ScheduleException cancels or changes the session
+of one schedule at one date.
+"""
+import bisect
+import datetime
+import heapq
+from collections import namedtuple
+
+from django.utils import timezone
+
+from apps.core.cache import cached_payload
+from apps.courses.conflicts import SLOT_FIELDS, Slot
+from apps.courses.ics import iter_ics
+from apps.courses.models import Holiday, Schedule, ScheduleException
+from apps.courses.planning import PLANNING_VERSION_KEY
+
+Occurrence = namedtuple('Occurrence', 'schedule_id course_id date start end location_name')
+
+# Bumped on every ScheduleException / Holiday save or delete (see signals.py)
+OCCURRENCES_VERSION_KEY = 'courses:occurrences'
+
+# Sessions change with the schedules (planning) and with the exceptions
+SESSIONS_VERSION_KEYS = (PLANNING_VERSION_KEY, OCCURRENCES_VERSION_KEY)
+
+# Longest window accepted by the endpoints, in days
+MAX_WINDOW_DAYS = 366
+
+
+class HolidayCalendar:
+    """Membership test of a date in a set of holiday ranges, by bisection."""
+
+    def __init__(self, ranges):
+        # Overlapping or adjacent ranges are merged first
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + datetime.timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def __contains__(self, date):
+        index = bisect.bisect_right(self.starts, date) - 1
+        return index >= 0 and date <= self.ends[index]
+
+
+def load_exceptions(schedule_ids, start, end):
+    """``{(schedule_id, date): ScheduleException}`` of a window, in one query."""
+    exceptions = ScheduleException.objects.filter(
+        schedule_id__in=schedule_ids, date__gte=start, date__lte=end
+    )
+    return {(exception.schedule_id, exception.date): exception for exception in exceptions}
+
+
+def load_holidays(start, end):
+    """HolidayCalendar of the holidays overlapping a window, in one query."""
+    return HolidayCalendar(
+        Holiday.objects.filter(start_date__lte=end, end_date__gte=start).values_list('start_date', 'end_date')
+    )
+
+
+def iter_schedule_occurrences(slot, start, end, exceptions, holidays, tz):
+    """Sessions of one schedule (a Slot) between two dates, bounds included."""
+    date = start + datetime.timedelta(days=(slot.day_of_week - start.weekday()) % 7)
+    while date <= end:
+        exception = exceptions.get((slot.id, date))
+        if date not in holidays and not (exception and exception.is_cancelled):
+            start_time, end_time, location_name = slot.start_time, slot.end_time, slot.location_name
+            if exception is not None:
+                start_time = exception.start_time or start_time
+                end_time = exception.end_time or end_time
+                location_name = exception.location_name or location_name
+            yield Occurrence(
+                slot.id, slot.course_id, date,
+                timezone.make_aware(datetime.datetime.combine(date, start_time), tz),
+                timezone.make_aware(datetime.datetime.combine(date, end_time), tz),
+                location_name,
+            )
+        date += datetime.timedelta(days=7)
+
+
+def iter_occurrences(schedules, start, end):
+    """
+    Sessions of many schedules between two dates, in start order.
+
+    ``schedules`` is a Schedule queryset (or an iterable of Slot). Reads the
+    schedules, their exceptions and the holidays of the window: three
+    queries, issued on the first ``next()``.
+    """
+    if hasattr(schedules, 'values_list'):
+        schedules = schedules.values_list(*SLOT_FIELDS)
+    slots = [slot if isinstance(slot, Slot) else Slot(*slot) for slot in schedules]
+    if not slots:
+        return
+    exceptions = load_exceptions([slot.id for slot in slots], start, end)
+    holidays = load_holidays(start, end)
+    tz = timezone.get_current_timezone()
+    yield from heapq.merge(
+        *(iter_schedule_occurrences(slot, start, end, exceptions, holidays, tz) for slot in slots),
+        key=lambda occurrence: (occurrence.start, occurrence.end)
+    )
+
+
+def course_occurrences(course_id, start, end):
+    """Sessions of one course between two dates."""
+    return iter_occurrences(Schedule.objects.filter(course_id=course_id), start, end)
+
+
+def course_sessions_payload(course_id, start, end):
+    """Sessions of a course as JSON-ready dicts, cached per (course, window)."""
+    def build():
+        return [{
+            'schedule': str(occurrence.schedule_id),
+            'date': occurrence.date.isoformat(),
+            'start': occurrence.start.isoformat(),
+            'end': occurrence.end.isoformat(),
+            'location_name': occurrence.location_name,
+        } for occurrence in course_occurrences(course_id, start, end)]
+    return cached_payload(SESSIONS_VERSION_KEYS, f'sessions:{course_id}:{start}:{end}', build, local=False)
+
+
+def course_calendar_payload(course_id, name, start, end, url=None):
+    """iCalendar export (bytes) of a course, cached per (course, window)."""
+    def build():
+        return b''.join(iter_ics(course_occurrences(course_id, start, end), {course_id: name}, name=name, url=url))
+    return cached_payload(SESSIONS_VERSION_KEYS, f'ics:{course_id}:{start}:{end}', build, local=False)
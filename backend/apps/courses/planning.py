@@ -0,0 +1,113 @@
+"""
+Weekly timetable ("planning") of the active courses.
+
+The grid is built from a single joined query over the schedules, grouped by
+day and sorted by start time, then cached until a course, a schedule or one
+of the denormalized names (style, level, node) changes. Node and style
+filters are applied to the cached grid, without touching the database.
+"""
+import hashlib
+
+from apps.core.cache import cached_payload, get_versions
+from apps.core.models import DanceStyle, Level
+from apps.core.styles import style_descendants
+from apps.courses.models import Schedule
+from apps.organization.models import OrganizationNode
+from apps.organization.tree import TREE_VERSION_KEY
+
+# Bumped on every Course / Schedule save or delete (see signals.py)
+PLANNING_VERSION_KEY = 'courses:planning'
+
+PLANNING_VERSION_KEYS = (
+    PLANNING_VERSION_KEY,
+    DanceStyle.CACHE_VERSION_KEY,
+    Level.CACHE_VERSION_KEY,
+    TREE_VERSION_KEY,
+)
+
+SLOT_FIELDS = (
+    'id', 'day_of_week', 'start_time', 'end_time', 'location_name',
+    'course__id', 'course__name', 'course__slug',
+    'course__style__id', 'course__style__slug', 'course__style__name',
+    'course__level__slug', 'course__level__name',
+    'course__node__slug', 'course__node__name', 'course__node__path',
+)
+
+
+def build_planning():
+    """
+    Return the grid: one entry per day of the week, each with its slots.
+
+    Every slot also carries ``branch``, the slugs of the course node and of
+    all its ancestors, used to filter by node without a query.
+    """
+    node_slugs = dict(OrganizationNode.objects.values_list('id', 'slug'))
+    node_slugs = {node_id.hex: slug for node_id, slug in node_slugs.items()}
+
+    days = [
+        {'day_of_week': day, 'label': label, 'slots': []}
+        for day, label in Schedule.DAYS
+    ]
+    rows = Schedule.objects.filter(course__is_active=True).order_by(
+        'day_of_week', 'start_time', 'end_time', 'course__name'
+    ).values(*SLOT_FIELDS)
+    for row in rows:
+        segments = row['course__node__path'].split(OrganizationNode.PATH_SEPARATOR)[:-1]
+        days[row['day_of_week']]['slots'].append({
+            'id': str(row['id']),
+            'start_time': row['start_time'].isoformat(),
+            'end_time': row['end_time'].isoformat(),
+            'location_name': row['location_name'],
+            'course': {
+                'id': str(row['course__id']),
+                'name': row['course__name'],
+                'slug': row['course__slug'],
+            },
+            'style': {
+                'id': str(row['course__style__id']),
+                'slug': row['course__style__slug'],
+                'name': row['course__style__name'],
+            },
+            'level': {'slug': row['course__level__slug'], 'name': row['course__level__name']},
+            'node': {'slug': row['course__node__slug'], 'name': row['course__node__name']},
+            'branch': [node_slugs[segment] for segment in segments if segment in node_slugs],
+        })
+    return days
+
+
+def planning_etag(request, *args, **kwargs):
+    """Strong ETag of the planning, combined from the versions of its parts."""
+    versions = get_versions(PLANNING_VERSION_KEYS)
+    digest = hashlib.sha1(repr(versions).encode('utf-8')).hexdigest()[:20]
+    return f'"planning-{digest}"'
+
+
+def planning_grid():
+    """Cached weekly grid of all the active courses."""
+    return cached_payload(PLANNING_VERSION_KEYS, 'grid', build_planning)
+
+
+def filter_planning(days, node=None, style=None):
+    """
+    Restrict a grid to a node branch and / or a style (sub-styles included).
+
+    Works on the cached grid only: the style tree comes from its own cache.
+    """
+    if node is None and style is None:
+        return days
+    style_ids = None
+    if style is not None:
+        style_ids = {str(style_id) for style_id in style_descendants().get(style, ())}
+
+    def keep(slot):
+        if node is not None and node not in slot['branch']:
+            return False
+        if style_ids is not None and slot['style']['id'] not in style_ids:
+            return False
+        return True
+
+    return [
+        {**day, 'slots': [slot for slot in day['slots'] if keep(slot)]}
+        for day in days
+    ]
+
@@ -0,0 +1,51 @@
+from django.db.models import F, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.cache import bump_version
+from apps.core.models import DanceStyle
+from apps.courses.models import Attendance, Course, Enrollment, Holiday, Schedule, ScheduleException
+from apps.courses.occurrences import OCCURRENCES_VERSION_KEY
+from apps.courses.planning import PLANNING_VERSION_KEY
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def bump_course_versions(sender, **kwargs):
+    # Course counts of the style tree
+    bump_version(DanceStyle.COURSE_COUNTS_VERSION_KEY)
+    bump_version(PLANNING_VERSION_KEY)
+
+
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+def bump_planning_version(sender, **kwargs):
+    bump_version(PLANNING_VERSION_KEY)
+
+
+@receiver(post_save, sender=ScheduleException)
+@receiver(post_delete, sender=ScheduleException)
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def bump_occurrences_version(sender, **kwargs):
+    bump_version(OCCURRENCES_VERSION_KEY)
+
+
+@receiver(post_delete, sender=Attendance)
+def discount_deleted_attendance(sender, instance, **kwargs):
+    """
+    Take a deleted mark (admin, or cascade from its enrollment or schedule)
+    out of the attendance totals kept by apps.courses.attendance.
+    """
+    present = int(instance.is_present)
+    Enrollment.objects.filter(pk=instance.enrollment_id, attendance_recorded__gt=0).update(
+        attendance_recorded=F('attendance_recorded') - 1,
+        attendance_present=F('attendance_present') - present,
+    )
+    Course.objects.filter(
+        pk=Subquery(Schedule.objects.filter(pk=instance.schedule_id).values('course_id')),
+        attendance_recorded__gt=0,
+    ).update(
+        attendance_recorded=F('attendance_recorded') - 1,
+        attendance_present=F('attendance_present') - present,
+    )
@@ -0,0 +1,69 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.core.models import DanceStyle, Level
+from apps.courses.attendance import record_attendance
+from apps.courses.models import Attendance, Course, Enrollment, Schedule
+from apps.organization.models import OrganizationNode
+
+User = get_user_model()
+
+
+class AttendanceCounterTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(
+            name="Bachata débutant", slug='bachata-debutant', description="",
+            style=DanceStyle.objects.create(name="Bachata", slug='bachata'),
+            level=Level.objects.create(name="Débutant", slug='debutant'),
+            node=OrganizationNode.objects.create(name="Paris", slug='paris', type='ROOT'),
+        )
+        self.schedule = Schedule.objects.create(
+            course=self.course, day_of_week=0, location_name="Salle A",
+            start_time=datetime.time(19), end_time=datetime.time(20),
+        )
+        self.enrollments = [
+            Enrollment.objects.create(user=User.objects.create(username=f'eleve{index}'), course=self.course)
+            for index in range(2)
+        ]
+        first, second = self.enrollments
+        # Two Mondays: the first student attends both, the second only one
+        record_attendance(self.course, self.schedule.pk, datetime.date(2026, 9, 7), {first.pk: True, second.pk: False})
+        record_attendance(self.course, self.schedule.pk, datetime.date(2026, 9, 14), {first.pk: True, second.pk: True})
+
+    def assertCountersMatchRows(self):
+        self.course.refresh_from_db()
+        rows = Attendance.objects.filter(schedule__course=self.course)
+        self.assertEqual(self.course.attendance_recorded, rows.count())
+        self.assertEqual(self.course.attendance_present, rows.filter(is_present=True).count())
+        for enrollment in Enrollment.objects.filter(course=self.course):
+            self.assertEqual(enrollment.attendance_recorded, enrollment.attendances.count())
+            self.assertEqual(enrollment.attendance_present, enrollment.attendances.filter(is_present=True).count())
+
+    def test_rates_after_recording(self):
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.attendance_rate, 3 / 4)
+        self.assertCountersMatchRows()
+
+    def test_deleting_a_mark_updates_the_rates(self):
+        second = self.enrollments[1]
+        Attendance.objects.get(enrollment=second, session_date=datetime.date(2026, 9, 7)).delete()
+        second.refresh_from_db()
+        self.assertEqual(second.attendance_rate, 1.0)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.attendance_rate, 1.0)
+        self.assertCountersMatchRows()
+
+    def test_deleting_an_enrollment_updates_the_course_rate(self):
+        self.enrollments[0].delete()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.attendance_rate, 1 / 2)
+        self.assertCountersMatchRows()
+
+    def test_deleting_a_schedule_clears_the_course_totals(self):
+        self.schedule.delete()
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.attendance_recorded, self.course.attendance_present), (0, 0))
+        self.assertIsNone(self.course.attendance_rate)
+        self.assertCountersMatchRows()
@@ -1,9 +1,11 @@
 from django.contrib import admin
-from .models import Event, EventPass, Registration
+from .inventory import recount_remaining
+from .models import Event, EventPass, PassHold, Registration
 
 class EventPassInline(admin.TabularInline):
     model = EventPass
     extra = 1
+    readonly_fields = ('quantity_remaining',)
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
@@ -16,3 +18,37 @@ class EventAdmin(admin.ModelAdmin):
 class RegistrationAdmin(admin.ModelAdmin):
     list_display = ('user', 'event_pass', 'registered_at', 'is_paid')
     list_filter = ('is_paid', 'event_pass__event')
+    readonly_fields = ('hold',)
+
+    # Registrations added or removed by hand are recounted in the stock
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        recount_remaining(obj.event_pass_id)
+        if change and 'event_pass' in form.changed_data:
+            recount_remaining(form.initial['event_pass'])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recount_remaining(obj.event_pass_id)
+
+    def delete_queryset(self, request, queryset):
+        pass_ids = set(queryset.values_list('event_pass_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for pass_id in pass_ids:
+            recount_remaining(pass_id)
+
+@admin.register(PassHold)
+class PassHoldAdmin(admin.ModelAdmin):
+    list_display = ('user', 'event_pass', 'quantity', 'status', 'expires_at')
+    list_filter = ('status', 'event_pass__event')
+    list_select_related = ('user', 'event_pass__event')
+
+    # Holds only change through apps.events.inventory (reserve / release / convert)
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
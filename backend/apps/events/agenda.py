@@ -0,0 +1,184 @@
+"""
+Unified weekly agenda: events, node events and course sessions.
+
+Each source is read with its own query, ordered by start date, and turned
+into a lazy stream of items; the streams are merged by start time with
+``heapq.merge``, so items are produced (and the JSON streamed) one at a
+time. An event belongs to every week it overlaps: one started the week
+before and still running is listed too. Course sessions come from the weekly schedules through
+``apps.courses.occurrences``.
+
+A week of the agenda is cached as JSON until one of its sources changes;
+a cache miss streams the merge and stores the result once complete.
+"""
+import datetime
+import hashlib
+import heapq
+import json
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.cache import PAYLOAD_TIMEOUT, get_versions
+from apps.courses.models import Course, Schedule
+from apps.courses.occurrences import SESSIONS_VERSION_KEYS, iter_occurrences
+from apps.events.models import Event
+from apps.organization.models import NodeEvent, OrganizationNode
+from apps.organization.tree import TREE_VERSION_KEY
+
+# Bumped on every Event save or delete (see signals.py)
+EVENTS_VERSION_KEY = 'events:agenda'
+
+# NodeEvent changes bump the tree version
+AGENDA_VERSION_KEYS = (EVENTS_VERSION_KEY, TREE_VERSION_KEY) + SESSIONS_VERSION_KEYS
+
+NODE_EVENT = 'NODE_EVENT'
+COURSE = 'COURSE'
+
+# Item types: the Event types, plus node events and course sessions
+TYPES = tuple(event_type for event_type, _ in Event.EVENT_TYPES) + (NODE_EVENT, COURSE)
+
+
+def week_bounds(date):
+    """Monday and next Monday (aware, local midnight) of the week of ``date``."""
+    monday = date - datetime.timedelta(days=date.weekday())
+    start = timezone.make_aware(datetime.datetime.combine(monday, datetime.time.min))
+    end = timezone.make_aware(datetime.datetime.combine(monday + datetime.timedelta(days=7), datetime.time.min))
+    return start, end
+
+
+def _isoformat(value):
+    # Local time, like the course sessions
+    return timezone.localtime(value).isoformat() if value is not None else None
+
+
+def iter_events(start, end, path=None, types=TYPES):
+    """Events overlapping [start, end); the end_date index bounds the scan."""
+    event_types = [event_type for event_type in types if event_type not in (NODE_EVENT, COURSE)]
+    if not event_types:
+        return
+    events = Event.objects.filter(start_date__lt=end, end_date__gte=start)
+    if len(event_types) < len(Event.EVENT_TYPES):
+        events = events.filter(type__in=event_types)
+    if path is not None:
+        events = events.filter(node__path__startswith=path)
+    rows = events.order_by('start_date', 'id').values_list(
+        'id', 'type', 'name', 'slug', 'start_date', 'end_date', 'location_name', 'node__slug'
+    )
+    for event_id, event_type, name, slug, starts, ends, location, node in rows.iterator():
+        yield starts, {
+            'type': event_type, 'id': str(event_id), 'title': name, 'slug': slug,
+            'start': _isoformat(starts), 'end': _isoformat(ends), 'location': location, 'node': node,
+        }
+
+
+def iter_node_events(start, end, path=None, types=TYPES):
+    """NodeEvent rows overlapping [start, end); without an end, rows starting in it."""
+    if NODE_EVENT not in types:
+        return
+    events = NodeEvent.objects.filter(start_datetime__lt=end).filter(
+        Q(end_datetime__gte=start) | Q(end_datetime__isnull=True, start_datetime__gte=start)
+    )
+    if path is not None:
+        events = events.filter(node__path__startswith=path)
+    rows = events.order_by('start_datetime', 'id').values_list(
+        'id', 'title', 'start_datetime', 'end_datetime', 'location', 'node__slug'
+    )
+    for event_id, title, starts, ends, location, node in rows.iterator():
+        yield starts, {
+            'type': NODE_EVENT, 'id': str(event_id), 'title': title, 'slug': None,
+            'start': _isoformat(starts), 'end': _isoformat(ends), 'location': location, 'node': node,
+        }
+
+
+def iter_sessions(start, end, path=None, types=TYPES):
+    """Sessions of the active courses in [start, end), holidays and exceptions applied."""
+    if COURSE not in types:
+        return
+    courses = Course.objects.filter(is_active=True)
+    if path is not None:
+        courses = courses.filter(node__path__startswith=path)
+    courses = {
+        course_id: (name, slug, node)
+        for course_id, name, slug, node in courses.values_list('id', 'name', 'slug', 'node__slug')
+    }
+    if not courses:
+        return
+    schedules = Schedule.objects.filter(course_id__in=list(courses))
+    last_day = (end - datetime.timedelta(microseconds=1)).date()
+    for occurrence in iter_occurrences(schedules, timezone.localdate(start), last_day):
+        if not start <= occurrence.start < end:
+            continue
+        name, slug, node = courses[occurrence.course_id]
+        yield occurrence.start, {
+            'type': COURSE, 'id': str(occurrence.schedule_id), 'title': name, 'slug': slug,
+            'start': _isoformat(occurrence.start), 'end': _isoformat(occurrence.end),
+            'location': occurrence.location_name, 'node': node,
+        }
+
+
+SOURCES = (iter_events, iter_node_events, iter_sessions)
+
+
+def iter_agenda(start, end, path=None, types=TYPES):
+    """Items of every source in [start, end), lazily merged by start time."""
+    streams = [source(start, end, path=path, types=types) for source in SOURCES]
+    for _, item in heapq.merge(*streams, key=lambda entry: entry[0]):
+        yield item
+
+
+def iter_agenda_json(start, end, path=None, types=TYPES, chunk_size=200):
+    """Stream ``{"start": ..., "end": ..., "items": [...]}``, a chunk of items at a time."""
+    yield f'{{"start":{json.dumps(start.isoformat())},"end":{json.dumps(end.isoformat())},"items":['.encode('utf-8')
+    separator = ''
+    batch = []
+    for item in iter_agenda(start, end, path=path, types=types):
+        batch.append(separator + json.dumps(item, ensure_ascii=False, separators=(',', ':')))
+        separator = ','
+        if len(batch) >= chunk_size:
+            yield ''.join(batch).encode('utf-8')
+            batch = []
+    if batch:
+        yield ''.join(batch).encode('utf-8')
+    yield b']}'
+
+
+def resolve_node_path(slug):
+    """Path of the node ``slug`` (its subtree prefix), or None when unknown."""
+    return OrganizationNode.objects.filter(slug=slug).values_list('path', flat=True).first()
+
+
+def agenda_cache_key(week_start, node=None, types=TYPES):
+    versions = '-'.join(str(version) for version in get_versions(AGENDA_VERSION_KEYS))
+    params = f'{week_start.date()}:{node or ""}:{",".join(sorted(types))}'
+    digest = hashlib.sha1(f'{params}:{versions}'.encode('utf-8')).hexdigest()[:20]
+    return f'events:agenda:{digest}'
+
+
+def weekly_agenda(date, node=None, types=TYPES):
+    """
+    JSON chunks of the week of ``date``, from the cache when possible.
+
+    Returns None when ``node`` is unknown. On a cache miss the chunks are
+    streamed as they are produced and stored once the whole week is sent.
+    """
+    start, end = week_bounds(date)
+    key = agenda_cache_key(start, node, types)
+    payload = cache.get(key)
+    if payload is not None:
+        return iter([payload])
+    path = None
+    if node is not None:
+        path = resolve_node_path(node)
+        if path is None:
+            return None
+    return _store_when_complete(key, iter_agenda_json(start, end, path=path, types=types))
+
+
+def _store_when_complete(key, chunks):
+    sent = []
+    for chunk in chunks:
+        sent.append(chunk)
+        yield chunk
+    cache.set(key, b''.join(sent), PAYLOAD_TIMEOUT)
@@ -0,0 +1,50 @@
+import datetime
+
+import django_filters
+from django.utils import timezone
+from apps.events.models import Event
+
+
+class EventFilter(django_filters.FilterSet):
+    """
+    Agenda filters of the evenements page, all on ``start_date`` so they
+    are served by the (start_date, id) index:
+
+    * ``upcoming``: events starting from now on;
+    * ``past``: events already started (listed most recent first, see
+      EventCursorPagination);
+    * ``after``, ``before``: events starting between these dates (AAAA-MM-JJ,
+      both included, in local time).
+    """
+    upcoming = django_filters.BooleanFilter(method='filter_upcoming')
+    past = django_filters.BooleanFilter(method='filter_past')
+    after = django_filters.DateFilter(method='filter_after')
+    before = django_filters.DateFilter(method='filter_before')
+
+    class Meta:
+        model = Event
+        fields = []
+
+    def lists_past(self):
+        """Whether the filtered events are past ones (to list backwards)."""
+        data = self.form.cleaned_data
+        return data.get('past') is True or data.get('upcoming') is False
+
+    def filter_upcoming(self, queryset, name, value):
+        if value:
+            return queryset.filter(start_date__gte=timezone.now())
+        return queryset.filter(start_date__lt=timezone.now())
+
+    def filter_past(self, queryset, name, value):
+        return self.filter_upcoming(queryset, name, not value)
+
+    # Bounds are compared as datetimes, a __date lookup would skip the index
+    def filter_after(self, queryset, name, value):
+        return queryset.filter(start_date__gte=local_midnight(value))
+
+    def filter_before(self, queryset, name, value):
+        return queryset.filter(start_date__lt=local_midnight(value + datetime.timedelta(days=1)))
+
+
+def local_midnight(date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
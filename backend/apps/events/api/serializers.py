@@ -1,22 +1,79 @@
+from django.utils import timezone
 from rest_framework import serializers
-from apps.events.models import Event, EventPass, Registration
+from apps.events.agenda import TYPES
+from apps.events.models import Event, EventPass, PassHold, Registration
 
 class EventPassSerializer(serializers.ModelSerializer):
     class Meta:
         model = EventPass
-        fields = ['id', 'name', 'price', 'quantity_available']
+        fields = ['id', 'name', 'price', 'quantity_available', 'quantity_remaining']
 
 class EventSerializer(serializers.ModelSerializer):
     passes = EventPassSerializer(many=True, read_only=True)
+    # Annotated by EventViewSet (cheapest pass, null without passes)
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True, allow_null=True)
     
     class Meta:
         model = Event
         fields = [
             'id', 'name', 'slug', 'type', 'description', 
-            'start_date', 'end_date', 'location_name', 'node', 'image', 'passes'
+            'start_date', 'end_date', 'location_name', 'node', 'image', 'passes', 'min_price'
         ]
 
 class RegistrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Registration
-        fields = ['id', 'user', 'event_pass', 'registered_at', 'is_paid']
+        fields = ['id', 'user', 'event_pass', 'registered_at', 'is_paid', 'hold']
+        # Registrations come from a confirmed hold (apps.events.inventory)
+        read_only_fields = ['user', 'event_pass', 'is_paid', 'hold']
+
+class PassHoldSerializer(serializers.ModelSerializer):
+    quantity = serializers.IntegerField(min_value=1, max_value=10, default=1)
+
+    class Meta:
+        model = PassHold
+        fields = ['id', 'user', 'event_pass', 'quantity', 'status', 'expires_at', 'created_at']
+        read_only_fields = ['user', 'status', 'expires_at']
+
+class WaitingRoomJoinSerializer(serializers.Serializer):
+    """Événement dont on rejoint la file d'attente (son ``id``)."""
+    event = serializers.UUIDField()
+
+class WaitingRoomStatusSerializer(serializers.Serializer):
+    """
+    Place dans la file : ``ahead`` acheteurs devant, ``eta_seconds`` avant
+    l'admission (null si la file est en pause), ``poll_after`` secondes
+    avant de redemander.
+    """
+    token = serializers.CharField(required=False)
+    admitted = serializers.BooleanField()
+    ahead = serializers.IntegerField()
+    eta_seconds = serializers.IntegerField(allow_null=True)
+    poll_after = serializers.IntegerField()
+
+class AgendaQuerySerializer(serializers.Serializer):
+    """
+    Paramètres de l'agenda : ``?week=`` (une date de la semaine voulue,
+    AAAA-MM-JJ ; par défaut la semaine en cours), ``?node=`` (slug d'un
+    noeud, sous-arbre inclus) et ``?types=`` (liste séparée par des
+    virgules parmi les types d'événement, NODE_EVENT et COURSE).
+    """
+    week = serializers.DateField(required=False)
+    node = serializers.SlugField(required=False)
+    types = serializers.CharField(required=False)
+
+    def validate_types(self, value):
+        types = {item.strip().upper() for item in value.split(',') if item.strip()}
+        unknown = types - set(TYPES)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Types inconnus : {', '.join(sorted(unknown))} (attendus : {', '.join(TYPES)})."
+            )
+        return tuple(sorted(types)) or TYPES
+
+    def validate(self, attrs):
+        return {
+            'week': attrs.get('week') or timezone.localdate(),
+            'node': attrs.get('node'),
+            'types': attrs.get('types') or TYPES,
+        }
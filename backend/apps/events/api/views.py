@@ -1,14 +1,166 @@
-from rest_framework import viewsets, permissions
-from apps.events.models import Event, Registration
-from .serializers import EventSerializer, RegistrationSerializer
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import viewsets, permissions, mixins, status
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.exceptions import NotFound, PermissionDenied, Throttled, ValidationError
+from rest_framework.response import Response
+from apps.events.agenda import weekly_agenda
+from apps.events.inventory import cancel_registration, convert, release, reserve
+from apps.events.models import Event, EventPass, PassHold, Registration
+from apps.events.waiting_room import NOT_ADMITTED, WaitingRoomError, check_admission, join, token_status
+from .filters import EventFilter
+from .serializers import (
+    AgendaQuerySerializer, EventSerializer, PassHoldSerializer, RegistrationSerializer, WaitingRoomJoinSerializer, WaitingRoomStatusSerializer
+)
+
+WAITING_ROOM_HEADER = 'X-Waiting-Room-Token'
+
+def require_admission(request, event_pass):
+    """Gate a reservation behind the waiting room of its event, if open."""
+    try:
+        check_admission(event_pass.event_id, request.headers.get(WAITING_ROOM_HEADER), request.user.pk)
+    except WaitingRoomError as exc:
+        if exc.message == NOT_ADMITTED:
+            raise Throttled(wait=exc.retry_after, detail=exc.message)
+        raise PermissionDenied(exc.message)
+
+def hold_passes(request, event_pass, quantity=1):
+    """Hold passes for the requesting user, behind the waiting room."""
+    require_admission(request, event_pass)
+    try:
+        return reserve(request.user, event_pass, quantity)
+    except DjangoValidationError as exc:
+        raise ValidationError({'event_pass': exc.messages})
+
+class EventCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (start_date, id): every page is a range scan of
+    the index, however deep. Past events (``?past=true``, ``?upcoming=false``)
+    page backwards in time.
+    """
+    ordering = ('start_date', 'id')
+
+    def get_ordering(self, request, queryset, view):
+        # Same parsing as the filters, so the direction matches the rows
+        filterset = view.filterset_class(request.query_params, queryset=queryset, request=request)
+        if filterset.is_valid() and filterset.lists_past():
+            return ('-start_date', '-id')
+        return self.ordering
 
 class EventViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Event.objects.all()
+    """
+    Agenda. Pages come from one scan of the (start_date, id) index, with
+    ``min_price`` as a correlated subquery, plus one prefetch of the passes.
+    """
+    queryset = Event.objects.annotate(
+        min_price=Subquery(
+            EventPass.objects.filter(event=OuterRef('pk')).order_by('price').values('price')[:1]
+        )
+    ).prefetch_related(
+        Prefetch('passes', queryset=EventPass.objects.order_by('price', 'name'))
+    )
     serializer_class = EventSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
+    filterset_class = EventFilter
+    pagination_class = EventCursorPagination
+
+    @action(detail=False, methods=['get'], url_path='calendar')
+    def calendar(self, request):
+        """
+        One week of events, node events and course sessions, merged by start
+        time (see apps.events.agenda). Accepts ``?week=``, ``?node=`` and
+        ``?types=``; streamed as JSON, cached per week until a source changes.
+        """
+        params = AgendaQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        chunks = weekly_agenda(data['week'], node=data['node'], types=data['types'])
+        if chunks is None:
+            raise Http404
+        return StreamingHttpResponse(chunks, content_type='application/json')
 
 class RegistrationViewSet(viewsets.ModelViewSet):
-    queryset = Registration.objects.all()
+    """
+    Registrations of the requesting user (all of them for staff), to list
+    or cancel. They are created by holding a pass (``events/holds``) and
+    confirming the hold (``events/holds/{id}/confirm/``) before it expires.
+    """
+    queryset = Registration.objects.select_related('event_pass').order_by('-registered_at')
     serializer_class = RegistrationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    http_method_names = ['get', 'delete', 'head', 'options']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
+
+    def perform_destroy(self, instance):
+        cancel_registration(instance)
+
+class PassHoldViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                      mixins.DestroyModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Passes held while the buyer pays. Creating a hold takes the passes from
+    the stock (or fails when sold out); ``confirm`` turns it into
+    registrations, deleting it gives the passes back. Holds not confirmed
+    in time are released by ``release_expired_holds``.
+    """
+    queryset = PassHold.objects.select_related('event_pass').order_by('-created_at')
+    serializer_class = PassHoldSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        serializer.instance = hold_passes(self.request, data['event_pass'], data['quantity'])
+
+    def perform_destroy(self, instance):
+        # Kept as RELEASED: the passes go back to the stock
+        release(instance)
+
+    @action(detail=True, methods=['post'])
+    def confirm(self, request, pk=None):
+        """Convert the hold into registrations (payment still to be received)."""
+        hold = self.get_object()
+        try:
+            registrations = convert(hold, is_paid=False)
+        except DjangoValidationError as exc:
+            raise ValidationError({'detail': exc.messages})
+        return Response(RegistrationSerializer(registrations, many=True).data, status=status.HTTP_201_CREATED)
+
+class WaitingRoomViewSet(viewsets.ViewSet):
+    """
+    Waiting room of the ticket launches. ``create`` queues the buyer and
+    returns a token; ``status`` reports its position and ETA from the cache
+    only (no authentication, no database), to be polled until admitted.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    serializer_class = WaitingRoomStatusSerializer
+
+    def create(self, request):
+        params = WaitingRoomJoinSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        try:
+            token, room_status = join(params.validated_data['event'])
+        except WaitingRoomError as exc:
+            raise NotFound(exc.message)
+        return Response({'token': token, **room_status}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'])
+    def status(self, request):
+        try:
+            room_status = token_status(request.query_params.get('token', ''))
+        except WaitingRoomError as exc:
+            raise ValidationError({'token': [exc.message]})
+        return Response(room_status)
@@ -0,0 +1,163 @@
+"""
+Oversell-proof EventPass inventory.
+
+``EventPass.quantity_remaining`` counts the passes neither sold nor held. A
+reservation takes passes with one conditional ``UPDATE``:
+
+    UPDATE eventpass SET quantity_remaining = quantity_remaining - n
+    WHERE id = ... AND quantity_remaining >= n
+
+which the database evaluates atomically on the row, so parallel buyers can
+never take more passes than the stock. The passes are then held (PassHold)
+for ``PASS_HOLD_MINUTES`` while the buyer pays: the hold is converted into
+Registration rows, released by the buyer, or released by the sweep once it
+expires (``release_expired_holds``, run by cron and before each reservation
+of the same pass). Unlimited passes (-1) are never counted.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.events.models import EventPass, PassHold, Registration
+
+ACTIVE = 'ACTIVE'
+CONVERTED = 'CONVERTED'
+RELEASED = 'RELEASED'
+
+SOLD_OUT = "Il ne reste plus assez de pass disponibles."
+HOLD_EXPIRED = "Votre réservation a expiré ou a déjà été utilisée."
+ALREADY_HOLDING = "Vous avez déjà une réservation en cours pour ce pass."
+
+
+def take_passes(event_pass_id, quantity):
+    """Take ``quantity`` passes if that many are left; return whether they were taken."""
+    return EventPass.objects.filter(
+        pk=event_pass_id, quantity_remaining__gte=quantity
+    ).update(quantity_remaining=F('quantity_remaining') - quantity) == 1
+
+
+def return_passes(event_pass_id, quantity):
+    # Unlimited passes (-1) are left untouched
+    EventPass.objects.filter(pk=event_pass_id, quantity_remaining__gte=0).update(
+        quantity_remaining=F('quantity_remaining') + quantity
+    )
+
+
+def reserve(user, event_pass, quantity=1):
+    """
+    Hold ``quantity`` passes for ``user`` until the hold expires.
+
+    Raises ValidationError when the pass is sold out, or when the user
+    already holds some of it (one hold at a time per buyer and pass).
+    """
+    if quantity < 1:
+        raise ValidationError("La quantité doit être au moins 1.")
+    # Expired holds of this pass go back to the stock first
+    release_expired_holds(event_pass_id=event_pass.pk)
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            if not event_pass.is_unlimited and not take_passes(event_pass.pk, quantity):
+                raise ValidationError(SOLD_OUT)
+            return PassHold.objects.create(
+                event_pass=event_pass, user=user, quantity=quantity,
+                expires_at=now + datetime.timedelta(minutes=settings.PASS_HOLD_MINUTES),
+            )
+    except IntegrityError:
+        # passhold_one_active_per_user: the passes taken above were rolled back
+        raise ValidationError(ALREADY_HOLDING)
+
+
+def release(hold):
+    """Give the passes of an active hold back; return whether it was active."""
+    with transaction.atomic():
+        # Only the request that actually changes the status returns the passes
+        released = PassHold.objects.filter(pk=hold.pk, status=ACTIVE).update(
+            status=RELEASED, updated_at=timezone.now()
+        )
+        if released:
+            return_passes(hold.event_pass_id, hold.quantity)
+    if released:
+        hold.status = RELEASED
+    return bool(released)
+
+
+def release_expired_holds(event_pass_id=None, now=None):
+    """
+    Release every expired hold (of one pass, or of all of them); return the
+    number of holds released.
+
+    Holds locked by a concurrent sweep are skipped, they are released by it.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        holds = PassHold.objects.select_for_update(skip_locked=True).filter(status=ACTIVE, expires_at__lte=now)
+        if event_pass_id is not None:
+            holds = holds.filter(event_pass_id=event_pass_id)
+        expired = list(holds.values_list('id', 'event_pass_id', 'quantity'))
+        if not expired:
+            return 0
+        PassHold.objects.filter(pk__in=[hold_id for hold_id, _, _ in expired], status=ACTIVE).update(
+            status=RELEASED, updated_at=now
+        )
+        returned = {}
+        for _, pass_id, quantity in expired:
+            returned[pass_id] = returned.get(pass_id, 0) + quantity
+        for pass_id, quantity in returned.items():
+            return_passes(pass_id, quantity)
+    return len(expired)
+
+
+def convert(hold, is_paid=True):
+    """
+    Turn an active, unexpired hold into one Registration per pass held.
+
+    Raises ValidationError when the hold expired or was already used.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if not PassHold.objects.filter(pk=hold.pk, status=ACTIVE, expires_at__gt=now).update(
+            status=CONVERTED, updated_at=now
+        ):
+            raise ValidationError(HOLD_EXPIRED)
+        hold.status = CONVERTED
+        return Registration.objects.bulk_create([
+            Registration(user_id=hold.user_id, event_pass_id=hold.event_pass_id, hold=hold, is_paid=is_paid)
+            for _ in range(hold.quantity)
+        ])
+
+
+def cancel_registration(registration):
+    """Delete a registration and give its pass back to the stock."""
+    with transaction.atomic():
+        deleted, _ = Registration.objects.filter(pk=registration.pk).delete()
+        if deleted:
+            return_passes(registration.event_pass_id, 1)
+
+
+def recount_remaining(event_pass_id):
+    """
+    Recompute the remaining passes from the registrations and the active
+    holds (after a stock change); return the new value.
+    """
+    with transaction.atomic():
+        # Blocks the reservations of this pass until the count is written
+        quantity = EventPass.objects.select_for_update().filter(
+            pk=event_pass_id
+        ).values_list('quantity_available', flat=True).first()
+        if quantity is None:
+            return None
+        if quantity < 0:
+            remaining = -1
+        else:
+            sold = Registration.objects.filter(event_pass_id=event_pass_id).count()
+            held = PassHold.objects.filter(
+                event_pass_id=event_pass_id, status=ACTIVE
+            ).aggregate(total=Sum('quantity'))['total'] or 0
+            remaining = max(quantity - sold - held, 0)
+        EventPass.objects.filter(pk=event_pass_id).update(quantity_remaining=remaining)
+    return remaining
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.events.inventory import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Give the passes of the expired holds back to the stock (cron or worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--every',
+            type=int,
+            default=0,
+            help="Keep running and sweep every N seconds instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_expired_holds()
+            if released or not options['every']:
+                self.stdout.write(self.style.SUCCESS(f"{released} réservation(s) expirée(s) libérée(s)."))
+            if not options['every']:
+                break
+            time.sleep(options['every'])
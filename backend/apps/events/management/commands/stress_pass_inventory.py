@@ -0,0 +1,97 @@
+import threading
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.utils import timezone
+
+from apps.events.inventory import convert, release, reserve
+from apps.events.models import Event, EventPass, PassHold, Registration
+from apps.organization.models import OrganizationNode
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer a throwaway pass with parallel reservations and check that no "
+        "pass is ever sold twice (to run against a staging database)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quantity', type=int, default=50, help="Stock of the throwaway pass.")
+        parser.add_argument('--buyers', type=int, default=200, help="Number of parallel buyers.")
+        parser.add_argument(
+            '--abandon-every',
+            type=int,
+            default=4,
+            help="One buyer out of N releases the hold instead of paying (0 = never).",
+        )
+
+    def handle(self, *args, **options):
+        quantity, buyers = options['quantity'], options['buyers']
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                "SQLite sérialise les écritures : des « database is locked » sont attendus."
+            ))
+        node = OrganizationNode.objects.first()
+        if node is None:
+            raise CommandError("Aucun nœud d'organisation pour l'événement de test.")
+
+        now = timezone.now()
+        stamp = f'{now:%Y%m%d%H%M%S%f}'
+        event = Event.objects.create(
+            name="Stress test inventaire", slug=f"stress-test-inventaire-{stamp}",
+            type='FESTIVAL', start_date=now, end_date=now, node=node,
+        )
+        # One buyer per thread: a user holds a pass only once at a time
+        users = User.objects.bulk_create([
+            User(username=f'stress-{stamp}-{index}', is_active=False) for index in range(buyers)
+        ])
+        event_pass = EventPass.objects.create(event=event, name="Stress", price=0, quantity_available=quantity)
+        outcomes = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(buyers)
+
+        def buy(index):
+            barrier.wait()
+            try:
+                hold = reserve(users[index], event_pass)
+                if options['abandon_every'] and index % options['abandon_every'] == 0:
+                    release(hold)
+                    outcome = 'released'
+                else:
+                    convert(hold)
+                    outcome = 'sold'
+            except ValidationError:
+                outcome = 'sold_out'
+            except OperationalError:
+                outcome = 'db_error'
+            finally:
+                connections.close_all()
+            with lock:
+                outcomes[outcome] += 1
+
+        try:
+            threads = [threading.Thread(target=buy, args=(index,)) for index in range(buyers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            event_pass.refresh_from_db()
+            sold = Registration.objects.filter(event_pass=event_pass).count()
+            held = PassHold.objects.filter(event_pass=event_pass, status='ACTIVE').count()
+            self.stdout.write(
+                f"Achats : {outcomes['sold']}, abandons : {outcomes['released']}, "
+                f"épuisés : {outcomes['sold_out']}, erreurs base : {outcomes['db_error']}"
+            )
+            self.stdout.write(f"Vendus : {sold}, en cours : {held}, restants : {event_pass.quantity_remaining}")
+            if sold != outcomes['sold'] or sold + held + event_pass.quantity_remaining != quantity:
+                raise CommandError("Stock incohérent : des pass ont été vendus deux fois ou perdus.")
+            self.stdout.write(self.style.SUCCESS("Aucun pass vendu deux fois."))
+        finally:
+            event.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.events.models import Event
+from apps.events.waiting_room import close_room, get_room, open_room
+
+
+class Command(BaseCommand):
+    help = "Open, re-tune or close the waiting room of an event (ticket launches)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('operation', choices=['open', 'close', 'status'])
+        parser.add_argument('event', help="Slug of the event.")
+        parser.add_argument('--rate', type=float, help="Buyers admitted per second.")
+        parser.add_argument('--burst', type=int, help="Buyers admitted at once when the room opens.")
+
+    def handle(self, *args, **options):
+        # The room must be seen by every web process, not only this command
+        if isinstance(caches[settings.WAITING_ROOM_CACHE], (LocMemCache, DummyCache)):
+            raise CommandError(
+                f"Le cache « {settings.WAITING_ROOM_CACHE} » (WAITING_ROOM_CACHE) n'est pas partagé "
+                "entre les processus : configurez Redis (REDIS_URL) pour la file d'attente."
+            )
+        event = Event.objects.filter(slug=options['event']).first()
+        if event is None:
+            raise CommandError(f"Événement « {options['event']} » introuvable.")
+
+        if options['operation'] == 'open':
+            open_room(event.pk, rate=options['rate'], burst=options['burst'])
+        elif options['operation'] == 'close':
+            close_room(event.pk)
+
+        room = get_room(event.pk)
+        if room is None:
+            self.stdout.write(f"File d'attente de « {event.name} » fermée.")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"File d'attente de « {event.name} » ouverte : "
+                f"{room['rate']:g} acheteur(s) par seconde, {room['burst']} d'emblée."
+            ))
@@ -0,0 +1,103 @@
+# Generated by Django 5.0.1 on 2026-10-17 23:10
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def init_quantity_remaining(apps, schema_editor):
+    EventPass = apps.get_model("events", "EventPass")
+    passes = EventPass.objects.annotate(sold=Count("registration"))
+    for event_pass in passes:
+        if event_pass.quantity_available < 0:
+            event_pass.quantity_remaining = -1
+        else:
+            event_pass.quantity_remaining = max(event_pass.quantity_available - event_pass.sold, 0)
+    EventPass.objects.bulk_update(passes, ["quantity_remaining"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="eventpass",
+            name="quantity_remaining",
+            field=models.IntegerField(default=-1, editable=False),
+        ),
+        migrations.CreateModel(
+            name="PassHold",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("quantity", models.PositiveSmallIntegerField(default=1)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("ACTIVE", "En cours"),
+                            ("CONVERTED", "Convertie en inscription"),
+                            ("RELEASED", "Libérée"),
+                        ],
+                        default="ACTIVE",
+                        max_length=20,
+                    ),
+                ),
+                ("expires_at", models.DateTimeField()),
+                (
+                    "event_pass",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="holds",
+                        to="events.eventpass",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pass_holds",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Réservation de pass",
+                "verbose_name_plural": "Réservations de pass",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "expires_at"],
+                        name="passhold_status_expires_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="registration",
+            name="hold",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Réservation dont provient l'inscription",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="registrations",
+                to="events.passhold",
+            ),
+        ),
+        migrations.RunPython(init_quantity_remaining, migrations.RunPython.noop),
+    ]
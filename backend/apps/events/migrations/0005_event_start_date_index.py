@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-17 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_pass_inventory"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["start_date", "id"], name="event_start_date_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def release_duplicate_holds(apps, schema_editor):
+    """Keep the latest active hold per (user, pass); give the others back."""
+    EventPass = apps.get_model("events", "EventPass")
+    PassHold = apps.get_model("events", "PassHold")
+    seen = set()
+    holds = PassHold.objects.filter(status="ACTIVE").order_by("-created_at")
+    for hold in holds.only("id", "user_id", "event_pass_id", "quantity"):
+        if (hold.user_id, hold.event_pass_id) not in seen:
+            seen.add((hold.user_id, hold.event_pass_id))
+            continue
+        PassHold.objects.filter(pk=hold.pk).update(status="RELEASED")
+        EventPass.objects.filter(pk=hold.event_pass_id, quantity_remaining__gte=0).update(
+            quantity_remaining=F("quantity_remaining") + hold.quantity
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_event_start_date_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(release_duplicate_holds, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="passhold",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "ACTIVE")),
+                fields=("user", "event_pass"),
+                name="passhold_one_active_per_user",
+            ),
+        ),
+    ]
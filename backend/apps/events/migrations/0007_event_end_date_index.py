@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_passhold_one_active_per_user"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["end_date"], name="event_end_date_idx"),
+        ),
+    ]
@@ -21,6 +21,12 @@ class Event(BaseModel):
     class Meta:
         verbose_name = "Événement"
         verbose_name_plural = "Événements"
+        indexes = [
+            # Agenda: date filters and keyset pagination on (start_date, id)
+            models.Index(fields=['start_date', 'id'], name='event_start_date_id_idx'),
+            # Weekly agenda: events still running from the start of the week on
+            models.Index(fields=['end_date'], name='event_end_date_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -30,12 +36,71 @@ class EventPass(BaseModel):
     name = models.CharField(max_length=100) # Full Pass, Social Pass...
     price = models.DecimalField(max_digits=10, decimal_places=2)
     quantity_available = models.IntegerField(default=-1) # -1 for unlimited
+    # Passes neither sold nor held (-1 for unlimited). Only written with
+    # conditional updates by apps.events.inventory, never by save()
+    quantity_remaining = models.IntegerField(default=-1, editable=False)
     
     def __str__(self):
         return f"{self.event.name} - {self.name}"
 
+    @property
+    def is_unlimited(self):
+        return self.quantity_available < 0
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.quantity_remaining = self.quantity_available
+            return super().save(*args, **kwargs)
+
+        if kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'quantity_remaining'
+            ]
+        previous = EventPass.objects.filter(pk=self.pk).values_list('quantity_available', flat=True).first()
+        super().save(*args, **kwargs)
+        if previous is not None and previous != self.quantity_available:
+            # Stock changed (admin): recount from the sold and held passes
+            from apps.events.inventory import recount_remaining
+            self.quantity_remaining = recount_remaining(self.pk)
+
+class PassHold(BaseModel):
+    """Passes réservés pendant le paiement, libérés à expiration."""
+    STATUS_CHOICES = (
+        ('ACTIVE', 'En cours'),
+        ('CONVERTED', 'Convertie en inscription'),
+        ('RELEASED', 'Libérée'),
+    )
+    event_pass = models.ForeignKey(EventPass, on_delete=models.CASCADE, related_name='holds')
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='pass_holds')
+    quantity = models.PositiveSmallIntegerField(default=1)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ACTIVE')
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Réservation de pass"
+        verbose_name_plural = "Réservations de pass"
+        indexes = [
+            # Sweep of the expired holds
+            models.Index(fields=['status', 'expires_at'], name='passhold_status_expires_idx'),
+        ]
+        constraints = [
+            # One hold at a time per buyer and pass, even for concurrent requests
+            models.UniqueConstraint(
+                fields=['user', 'event_pass'], condition=models.Q(status='ACTIVE'),
+                name='passhold_one_active_per_user',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.event_pass} x{self.quantity}"
+
 class Registration(BaseModel):
     user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='event_registrations')
     event_pass = models.ForeignKey(EventPass, on_delete=models.CASCADE)
     registered_at = models.DateTimeField(auto_now_add=True)
     is_paid = models.BooleanField(default=False)
+    hold = models.ForeignKey(
+        PassHold, on_delete=models.SET_NULL, null=True, blank=True, related_name='registrations',
+        help_text="Réservation dont provient l'inscription"
+    )
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.cache import bump_version
+from apps.events.agenda import EVENTS_VERSION_KEY
+from apps.events.models import Event
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def bump_agenda_version(sender, **kwargs):
+    bump_version(EVENTS_VERSION_KEY)
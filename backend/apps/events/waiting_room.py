@@ -0,0 +1,180 @@
+"""
+Virtual waiting room in front of the pass reservations of an event.
+
+While the room of an event is open, buyers join a queue and get a signed
+token carrying their position. Positions are admitted at a steady rate:
+
+    admitted = base + burst + (now - since) * rate
+
+so admission needs no worker, and the state of a room is two cache keys:
+its settings, written by the operator only, and the counter handing out
+positions, only ever advanced with ``incr``. Polling the status
+of a token only reads these keys: the database is never touched until the
+buyer is admitted and reserves. An admitted token is bound to the first
+user reserving with it, so it cannot be passed around.
+
+The state lives in the ``WAITING_ROOM_CACHE`` alias, which must be a cache
+shared by every process (Redis): with a LocMemCache each worker, and the
+``waiting_room`` command, would see a room of its own.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+
+SALT = 'events.waiting-room'
+
+# Rooms close by themselves after this long if nobody closes them
+ROOM_TIMEOUT = 60 * 60 * 24
+
+NOT_OPEN = "Aucune file d'attente n'est ouverte pour cet événement."
+INVALID_TOKEN = "Jeton de file d'attente invalide ou expiré."
+NOT_ADMITTED = "Votre tour dans la file d'attente n'est pas encore arrivé."
+TOKEN_IN_USE = "Ce jeton de file d'attente est déjà utilisé par un autre compte."
+
+
+class WaitingRoomError(Exception):
+    """Refused admission; ``retry_after`` is in seconds when known."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+
+def _store():
+    return caches[settings.WAITING_ROOM_CACHE]
+
+
+def _key(event_id, part):
+    return f'events:waiting-room:{event_id}:{part}'
+
+
+def admitted_count(room, now):
+    """Number of positions admitted at ``now`` (epoch seconds)."""
+    return room['base'] + room['burst'] + int(max(now - room['since'], 0) * room['rate'])
+
+
+def open_room(event_id, rate=None, burst=None, timeout=ROOM_TIMEOUT):
+    """
+    Open (or re-tune) the room of an event for ``timeout`` seconds.
+    Positions already admitted stay admitted; the rest of the queue
+    continues at the new rate. Open it when the sales start: admissions
+    accrue from then on, whether buyers are waiting or not.
+    """
+    store = _store()
+    now = time.time()
+    room = store.get(_key(event_id, 'room'))
+    base = 0
+    if room is not None:
+        base = admitted_count(room, now) - (burst if burst is not None else room['burst'])
+    if not store.add(_key(event_id, 'tail'), 0, timeout):
+        store.touch(_key(event_id, 'tail'), timeout)
+    store.set(_key(event_id, 'room'), {
+        'rate': settings.WAITING_ROOM_RATE if rate is None else rate,
+        'burst': max(settings.WAITING_ROOM_BURST if burst is None else burst, 1),
+        'since': now,
+        'base': base,
+        # The tail counter is recreated with what is left of the timeout
+        'expires': now + timeout,
+    }, timeout)
+
+
+def close_room(event_id):
+    """Close the room: reservations are no longer gated."""
+    _store().delete_many([_key(event_id, 'room'), _key(event_id, 'tail')])
+
+
+def get_room(event_id):
+    return _store().get(_key(event_id, 'room'))
+
+
+def join(event_id):
+    """
+    Queue a buyer; return ``(token, status)``. Raises WaitingRoomError when
+    the room of the event is not open.
+    """
+    store = _store()
+    room = store.get(_key(event_id, 'room'))
+    if room is None:
+        raise WaitingRoomError(NOT_OPEN)
+    try:
+        position = store.incr(_key(event_id, 'tail'))
+    except ValueError:
+        # Counter evicted: restart after the admitted positions, until the
+        # room itself expires (add: a concurrent restart wins)
+        now = time.time()
+        timeout = max(math.ceil(room.get('expires', now + ROOM_TIMEOUT) - now), 1)
+        store.add(_key(event_id, 'tail'), admitted_count(room, now), timeout)
+        position = store.incr(_key(event_id, 'tail'))
+
+    now = time.time()
+    token = signing.dumps({'e': str(event_id), 'p': position}, salt=SALT, compress=True)
+    return token, _status(room, position, now)
+
+
+def _status(room, position, now):
+    # Positions still to admit, this one included
+    remaining = max(position - admitted_count(room, now), 0)
+    if not remaining:
+        eta = 0
+    elif room['rate'] > 0:
+        eta = math.ceil(remaining / room['rate'])
+    else:
+        # Paused room
+        eta = None
+    return {
+        'admitted': not remaining,
+        'ahead': max(remaining - 1, 0),
+        'eta_seconds': eta,
+        # Hint for the client: poll less often when far from the front
+        'poll_after': 0 if not remaining else min(max((eta or 30) // 2, 2), 30),
+    }
+
+
+def read_token(token):
+    """``(event_id, position)`` of a token; raises WaitingRoomError."""
+    try:
+        data = signing.loads(token, salt=SALT, max_age=settings.WAITING_ROOM_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        raise WaitingRoomError(INVALID_TOKEN)
+    return data['e'], data['p']
+
+
+def token_status(token):
+    """
+    Position and ETA of a token, from the cache only. Once the room is
+    closed every token is admitted.
+    """
+    event_id, position = read_token(token)
+    room = get_room(event_id)
+    if room is None:
+        return {'admitted': True, 'ahead': 0, 'eta_seconds': 0, 'poll_after': 0}
+    return _status(room, position, time.time())
+
+
+def check_admission(event_id, token, user_id):
+    """
+    Let a reservation of ``event_id`` through. Raises WaitingRoomError
+    unless the room is closed or ``token`` is admitted (and not already
+    used by another user).
+    """
+    room = get_room(event_id)
+    if room is None:
+        return
+    if not token:
+        raise WaitingRoomError(NOT_ADMITTED)
+    token_event_id, position = read_token(token)
+    if token_event_id != str(event_id):
+        raise WaitingRoomError(INVALID_TOKEN)
+    status = _status(room, position, time.time())
+    if not status['admitted']:
+        raise WaitingRoomError(NOT_ADMITTED, retry_after=status['eta_seconds'])
+
+    store = _store()
+    used_key = _key(event_id, f'used:{position}')
+    store.add(used_key, str(user_id), settings.WAITING_ROOM_TOKEN_MAX_AGE)
+    if store.get(used_key) != str(user_id):
+        raise WaitingRoomError(TOKEN_IN_USE)
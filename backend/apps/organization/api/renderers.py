@@ -0,0 +1,16 @@
+import json
+
+from rest_framework import renderers
+
+
+class BinaryRenderer(renderers.BaseRenderer):
+    """Sends pre-packed bytes as is (errors are still sent as JSON bytes)."""
+    media_type = 'application/octet-stream'
+    format = 'bin'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        return json.dumps(data).encode('utf-8')
@@ -23,7 +23,7 @@ class OrganizationNodeSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'slug', 'type', 'video_url', 'description', 'parent', 'children',
             # Overlay content
-            'cover_image', 'short_description', 'content', 'cta_text', 'cta_url',
+            'cover_image', 'short_description', 'content', 'content_html', 'cta_text', 'cta_url',
             # Events
             'events',
             # 3D Configuration
@@ -36,14 +36,50 @@ class OrganizationNodeSerializer(serializers.ModelSerializer):
             'is_visible_3d',
             'created_at', 'updated_at'
         ]
+        # Only sent when explicitly requested with ?fields= or ?include=
+        opt_in_fields = ['content_html']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldsets (?fields= / ?omit= / ?include=), parsed by the viewset
+        selected = self.context.get('fields')
+        omitted = self.context.get('omit') or ()
+        included = self.context.get('include') or ()
+        for name in list(self.fields):
+            if selected is not None:
+                keep = name in selected or name in included
+            else:
+                keep = name not in self.Meta.opt_in_fields or name in included
+            if not keep or name in omitted:
+                self.fields.pop(name)
+
+    def validate_parent(self, value):
+        if value is not None and self.instance is not None and self.instance.path \
+                and value.path.startswith(self.instance.path):
+            raise serializers.ValidationError("Un noeud ne peut pas être rattaché à l'un de ses descendants.")
+        return value
 
     def get_children(self, obj):
+        children_map = self.context.get('children_map')
+        if children_map is not None:
+            # Tree preloaded by the viewset: no query per node
+            level = self.context.get('level', 0)
+            depth = self.context.get('depth')
+            if depth is not None and level >= depth:
+                return []
+            children = children_map.get(obj.id, [])
+            context = {**self.context, 'level': level + 1}
+            return OrganizationNodeSerializer(children, many=True, context=context).data
         if obj.children.exists():
             return OrganizationNodeSerializer(obj.children.all(), many=True).data
         return []
     
     def get_events(self, obj):
         """Retourne les événements à venir, triés par date, les featured en premier."""
+        events_map = self.context.get('events_map')
+        if events_map is not None:
+            # Events preloaded in one query by the viewset
+            return NodeEventSerializer(events_map.get(obj.id, []), many=True, context=self.context).data
         from django.utils import timezone
         events = obj.node_events.filter(
             start_datetime__gte=timezone.now()
@@ -51,6 +87,67 @@ class OrganizationNodeSerializer(serializers.ModelSerializer):
         return NodeEventSerializer(events, many=True).data
 
 
+class PlanetConfigSerializer(serializers.ModelSerializer):
+    """Champs de configuration 3D modifiables en masse (panneau de configuration des planètes)."""
+
+    class Meta:
+        model = OrganizationNode
+        fields = [
+            'id', 'slug', 'name',
+            'visual_source', 'planet_type', 'planet_color', 'orbit_radius', 'orbit_speed',
+            'planet_scale', 'rotation_speed', 'orbit_phase',
+            'orbit_shape', 'orbit_roundness',
+            'entry_start_x', 'entry_start_y', 'entry_start_z', 'entry_speed',
+            'is_visible_3d',
+            'updated_at'
+        ]
+        read_only_fields = ['id', 'slug', 'name', 'updated_at']
+
+
+class NodeFieldsetQuerySerializer(serializers.Serializer):
+    """
+    Paramètres ``?fields=``, ``?omit=``, ``?include=`` (noms séparés par des
+    virgules) et ``?depth=`` (niveaux d'enfants imbriqués, 0 = aucun) des noeuds.
+    ``include`` ajoute des champs optionnels (ex: ``content_html``) à la sélection.
+    """
+    fields = serializers.CharField(required=False)
+    omit = serializers.CharField(required=False)
+    include = serializers.CharField(required=False)
+    depth = serializers.IntegerField(required=False, min_value=0)
+
+    def _parse_names(self, value):
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names - set(OrganizationNodeSerializer.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError(f"Champs inconnus : {', '.join(sorted(unknown))}.")
+        return names
+
+    def validate_fields(self, value):
+        return self._parse_names(value)
+
+    def validate_omit(self, value):
+        return self._parse_names(value)
+
+    def validate_include(self, value):
+        return self._parse_names(value)
+
+
+class KeyframesQuerySerializer(serializers.Serializer):
+    """Paramètres de /organization/nodes/keyframes/ (temps en secondes)."""
+    start = serializers.FloatField(default=0.0, min_value=0.0)
+    end = serializers.FloatField(default=10.0, min_value=0.0)
+    steps = serializers.IntegerField(default=61, min_value=1, max_value=1000)
+    speed = serializers.FloatField(default=1.0)
+    spacing = serializers.FloatField(default=1.0, min_value=0.0)
+    entry = serializers.BooleanField(default=True)
+    stagger = serializers.FloatField(default=0.2, min_value=0.0)
+
+    def validate(self, attrs):
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError({'end': "Doit être supérieur ou égal à start."})
+        return attrs
+
+
 class OrganizationRoleSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrganizationRole
@@ -1,8 +1,25 @@
-from rest_framework import viewsets, permissions
+import numpy as np
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.db.models.functions import Length
+from django.utils.decorators import method_decorator
+from django.utils import timezone
+from django.views.decorators.http import condition
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from apps.core.cache import bump_version
 from apps.organization.models import OrganizationNode, OrganizationRole
-from .serializers import OrganizationNodeSerializer, OrganizationRoleSerializer
+from apps.organization.orbits import NODE_FIELDS, evaluate_positions
+from apps.organization.scene import build_scene_snapshot
+from apps.organization.tree import (
+    TREE_VERSION_KEY, build_children_map, iter_structure_json, load_upcoming_events, tree_etag, tree_events_etag
+)
+from .renderers import BinaryRenderer
+from .serializers import (
+    KeyframesQuerySerializer, NodeFieldsetQuerySerializer, OrganizationNodeSerializer, OrganizationRoleSerializer, PlanetConfigSerializer
+)
 
 class OrganizationNodeViewSet(viewsets.ModelViewSet):
     queryset = OrganizationNode.objects.filter(parent=None)
@@ -10,23 +27,227 @@ class OrganizationNodeViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
 
+    # Columns always read: needed to assemble the tree and to look nodes up
+    TREE_REQUIRED_FIELDS = {'id', 'parent', 'slug'}
+
+    def get_fieldset(self):
+        """Validated ``?fields=``, ``?omit=`` and ``?depth=`` of list / retrieve."""
+        if not hasattr(self, '_fieldset'):
+            params = NodeFieldsetQuerySerializer(data=self.request.query_params)
+            params.is_valid(raise_exception=True)
+            self._fieldset = params.validated_data
+        return self._fieldset
+
+    def get_subtree_root(self):
+        """Node selected by ``?under=<slug>`` on list endpoints, if any."""
+        if not hasattr(self, '_subtree_root'):
+            slug = self.request.query_params.get('under')
+            if slug and self.action in ('list', 'structure'):
+                self._subtree_root = get_object_or_404(OrganizationNode, slug=slug)
+            else:
+                self._subtree_root = None
+        return self._subtree_root
+
+    def get_tree_nodes(self):
+        under = self.get_subtree_root()
+        if under is not None:
+            return under.get_descendants()
+        return OrganizationNode.objects.all()
+
+    def get_children_map(self):
+        """Load the node table (or the ``?under=`` subtree) in one query, grouped by parent id."""
+        if not hasattr(self, '_children_map'):
+            nodes = self.get_tree_nodes()
+            fieldset = self.get_fieldset()
+
+            # Never read the columns the response will not contain
+            columns = {field.name for field in OrganizationNode._meta.concrete_fields}
+            if 'fields' in fieldset:
+                selected = fieldset['fields'] | fieldset.get('include', set())
+                nodes = nodes.only(*self.TREE_REQUIRED_FIELDS, *(selected & columns))
+            else:
+                hidden = fieldset.get('omit', set()) | {'content_hash'}
+                hidden |= set(OrganizationNodeSerializer.Meta.opt_in_fields) - fieldset.get('include', set())
+                nodes = nodes.defer(*(hidden & columns - self.TREE_REQUIRED_FIELDS))
+
+            if 'depth' in fieldset:
+                under = self.get_subtree_root()
+                max_depth = (under.depth + 1 if under is not None else 0) + fieldset['depth']
+                nodes = nodes.alias(path_length=Length('path')).filter(
+                    path_length__lte=(max_depth + 1) * OrganizationNode.PATH_SEGMENT_LENGTH
+                )
+
+            self._children_map = build_children_map(nodes)
+        return self._children_map
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ('list', 'retrieve'):
+            fieldset = self.get_fieldset()
+            context['fields'] = fieldset.get('fields')
+            context['omit'] = fieldset.get('omit')
+            context['include'] = fieldset.get('include')
+            context['depth'] = fieldset.get('depth')
+            context['children_map'] = self.get_children_map()
+            selected = fieldset.get('fields')
+            if selected is not None:
+                selected = selected | fieldset.get('include', set())
+            if 'events' in (selected or ['events']) and 'events' not in fieldset.get('omit', ()):
+                under = self.get_subtree_root()
+                context['events_map'] = load_upcoming_events(
+                    node_ids=under.get_descendants().values('id') if under is not None else None
+                )
+        return context
+
+    @method_decorator(condition(etag_func=tree_events_etag))
+    def list(self, request, *args, **kwargs):
+        under = self.get_subtree_root()
+        roots = self.get_children_map().get(under.id if under is not None else None, [])
+        page = self.paginate_queryset(roots)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(roots, many=True)
+        return Response(serializer.data)
+
+    @method_decorator(condition(etag_func=tree_events_etag))
+    def retrieve(self, request, *args, **kwargs):
+        slug = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        roots = self.get_children_map().get(None, [])
+        instance = next((node for node in roots if node.slug == slug), None)
+        if instance is None:
+            raise Http404
+        self.check_object_permissions(request, instance)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
     @action(detail=False, methods=['get'], url_path='structure')
+    @method_decorator(condition(etag_func=tree_etag))
     def structure(self, request):
         """
         Specific endpoint for Three.js 3D structure.
-        Returns a flat list of nodes with parent references.
-        """
-        nodes = OrganizationNode.objects.all()
-        data = []
-        for node in nodes:
-            data.append({
-                "id": str(node.id),
-                "name": node.name,
-                "slug": node.slug,
-                "type": node.type,
-                "parent_id": str(node.parent.id) if node.parent else None,
-            })
-        return Response({"nodes": data})
+        Returns a flat list of nodes with parent references, streamed in
+        chunks from a single query.
+        Accepts ``?under=<slug>`` to restrict the list to a subtree.
+        """
+        return StreamingHttpResponse(
+            iter_structure_json(self.get_tree_nodes()),
+            content_type='application/json'
+        )
+
+    @action(detail=False, methods=['get'], url_path='scene', renderer_classes=[BinaryRenderer])
+    @method_decorator(condition(etag_func=tree_etag))
+    def scene(self, request):
+        """
+        Compact binary snapshot of the 3D scene: numeric parameters as
+        little-endian float32 columns behind a small JSON header
+        (see apps.organization.scene for the layout).
+        """
+        return Response(build_scene_snapshot(build_url=request.build_absolute_uri))
+
+    @action(detail=False, methods=['get'], url_path='keyframes')
+    @method_decorator(condition(etag_func=tree_etag))
+    def keyframes(self, request):
+        """
+        Precomputed positions of the visible nodes (orbit + entry animation),
+        evaluated server-side in one vectorized pass.
+
+        Query: ``start``, ``end``, ``steps`` (times in seconds), ``speed`` and
+        ``spacing`` (global multipliers), ``entry`` (include the entry line),
+        ``stagger`` (delay between two planet entries).
+        Returns ``positions[node][step] = [x, y, z]``.
+        """
+        params = KeyframesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        nodes = list(
+            OrganizationNode.objects.filter(is_visible_3d=True).values('id', 'slug', *NODE_FIELDS)
+        )
+        times = np.linspace(params['start'], params['end'], params['steps'])
+        positions = evaluate_positions(
+            nodes, times,
+            speed=params['speed'],
+            spacing=params['spacing'],
+            entry=params['entry'],
+            stagger=params['stagger'],
+        )
+        return Response({
+            'times': times.round(6).tolist(),
+            'nodes': [{'id': str(node['id']), 'slug': node['slug']} for node in nodes],
+            'positions': positions.transpose(1, 0, 2).round(5).tolist(),
+        })
+
+    @action(detail=False, methods=['patch'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Bulk update of the 3D configuration of several planets.
+
+        Body: ``[{"slug": "...", "changes": {"orbit_radius": 6.5, ...}}, ...]``.
+        Every item is validated first; nothing is written unless all of them
+        are valid, then all rows are saved with one ``bulk_update`` inside a
+        single transaction.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'detail': "Une liste de {slug, changes} est attendue."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        slugs = [item.get('slug') for item in items if isinstance(item, dict)]
+        nodes = OrganizationNode.objects.in_bulk(
+            [slug for slug in slugs if isinstance(slug, str)], field_name='slug'
+        )
+        writable = {
+            name for name, field in PlanetConfigSerializer().fields.items() if not field.read_only
+        }
+
+        errors = []
+        validated = []
+        seen = set()
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get('changes'), dict):
+                errors.append({'non_field_errors': ["Format attendu : {slug, changes}."]})
+                continue
+            slug = item.get('slug')
+            node = nodes.get(slug) if isinstance(slug, str) else None
+            if node is None:
+                errors.append({'slug': [f"Noeud introuvable : {slug}."]})
+                continue
+            if slug in seen:
+                errors.append({'slug': [f"Noeud présent plusieurs fois : {slug}."]})
+                continue
+            seen.add(slug)
+            unknown = sorted(set(item['changes']) - writable)
+            if unknown:
+                errors.append({name: ["Champ non modifiable en masse."] for name in unknown})
+                continue
+            serializer = PlanetConfigSerializer(node, data=item['changes'], partial=True)
+            if not serializer.is_valid():
+                errors.append(serializer.errors)
+                continue
+            errors.append({})
+            validated.append((node, serializer.validated_data))
+
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        updated_fields = {'updated_at'}
+        now = timezone.now()
+        for node, changes in validated:
+            for name, value in changes.items():
+                setattr(node, name, value)
+            node.updated_at = now
+            updated_fields.update(changes)
+
+        updated = [node for node, _ in validated]
+        with transaction.atomic():
+            # bulk_update() bypasses save() and its signals
+            OrganizationNode.objects.bulk_update(updated, sorted(updated_fields))
+            bump_version(TREE_VERSION_KEY)
+
+        return Response(PlanetConfigSerializer(updated, many=True).data)
 
 class OrganizationRoleViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = OrganizationRole.objects.all()
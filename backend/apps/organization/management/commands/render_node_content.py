@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.cache import bump_version
+from apps.organization.models import OrganizationNode
+from apps.organization.tree import TREE_VERSION_KEY
+
+
+class Command(BaseCommand):
+    help = "Re-render OrganizationNode.content to HTML (after a renderer upgrade)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help="Re-render every node, even when its content hash is up to date.",
+        )
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        nodes = OrganizationNode.objects.only('id', 'content', 'content_html', 'content_hash')
+
+        batch = []
+        rendered = 0
+        for node in nodes.iterator(chunk_size=batch_size):
+            if node.render_content(force=options['force']):
+                batch.append(node)
+            if len(batch) >= batch_size:
+                OrganizationNode.objects.bulk_update(batch, ['content_html', 'content_hash'])
+                rendered += len(batch)
+                batch = []
+        if batch:
+            OrganizationNode.objects.bulk_update(batch, ['content_html', 'content_hash'])
+            rendered += len(batch)
+
+        if rendered:
+            bump_version(TREE_VERSION_KEY)
+        self.stdout.write(self.style.SUCCESS(f"{rendered} noeud(s) re-rendu(s)."))
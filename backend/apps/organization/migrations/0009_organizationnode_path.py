@@ -0,0 +1,41 @@
+# Generated by Django 5.0.1 on 2026-10-17 17:47
+
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    OrganizationNode = apps.get_model("organization", "OrganizationNode")
+    nodes = list(OrganizationNode.objects.only("id", "parent_id"))
+    children = {}
+    for node in nodes:
+        children.setdefault(node.parent_id, []).append(node)
+
+    stack = [(node, "") for node in children.get(None, [])]
+    while stack:
+        node, prefix = stack.pop()
+        node.path = prefix + node.id.hex + "/"
+        stack.extend((child, node.path) for child in children.get(node.id, []))
+
+    OrganizationNode.objects.bulk_update(nodes, ["path"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organization", "0008_add_overlay_fields_and_nodeevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organizationnode",
+            name="path",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text="Chemin hiérarchique (maintenu automatiquement)",
+                max_length=1024,
+            ),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
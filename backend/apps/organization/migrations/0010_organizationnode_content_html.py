@@ -0,0 +1,61 @@
+# Generated by Django 5.0.1 on 2026-10-17 18:40
+
+import hashlib
+
+import markdown
+import nh3
+from django.db import migrations, models
+
+
+# Frozen copy of apps.organization.rendering at RENDERER_VERSION 1: later
+# renderer changes must not alter what this migration does. Nodes are
+# re-rendered with the current renderer by ``render_node_content``.
+def render_markdown(source):
+    html = markdown.markdown(source, extensions=["extra", "sane_lists"], output_format="html")
+    return nh3.clean(html, link_rel="noopener noreferrer nofollow")
+
+
+def content_hash(source):
+    return hashlib.sha256(f"1:{source}".encode("utf-8")).hexdigest()
+
+
+def render_contents(apps, schema_editor):
+    OrganizationNode = apps.get_model("organization", "OrganizationNode")
+    nodes = list(OrganizationNode.objects.only("id", "content"))
+    for node in nodes:
+        node.content_html = render_markdown(node.content)
+        node.content_hash = content_hash(node.content)
+    OrganizationNode.objects.bulk_update(
+        nodes, ["content_html", "content_hash"], batch_size=200
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organization", "0009_organizationnode_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organizationnode",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Empreinte du contenu rendu (source + version du moteur)",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="organizationnode",
+            name="content_html",
+            field=models.TextField(
+                blank=True,
+                editable=False,
+                help_text="Rendu HTML assaini du contenu, mis à jour à l'enregistrement",
+                verbose_name="Contenu détaillé (HTML)",
+            ),
+        ),
+        migrations.RunPython(render_contents, migrations.RunPython.noop),
+    ]
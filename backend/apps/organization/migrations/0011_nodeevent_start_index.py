@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-17 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organization", "0010_organizationnode_content_html"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="nodeevent",
+            index=models.Index(
+                fields=["start_datetime", "id"], name="nodeevent_start_id_idx"
+            ),
+        ),
+    ]
@@ -1,5 +1,11 @@
+import uuid
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Concat, Length, Substr
 from apps.core.models import BaseModel
+from apps.organization.rendering import content_hash, render_markdown
 
 class OrganizationNode(BaseModel):
     NODE_TYPES = (
@@ -16,6 +22,19 @@ class OrganizationNode(BaseModel):
         on_delete=models.SET_NULL, 
         related_name='children'
     )
+    PATH_SEPARATOR = '/'
+    PATH_SEGMENT_LENGTH = 33  # uuid hex + separator
+
+    # Chemin matérialisé : ids (hex) des ancêtres puis du noeud, séparés par "/".
+    # Maintenu par save() et le signal post_delete, il permet de lire un
+    # sous-arbre ou les ancêtres d'un noeud en une seule requête indexée.
+    path = models.CharField(
+        max_length=1024,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Chemin hiérarchique (maintenu automatiquement)"
+    )
     type = models.CharField(max_length=20, choices=NODE_TYPES)
     video_url = models.URLField(blank=True) # For the popup
     description = models.TextField(blank=True)
@@ -39,6 +58,18 @@ class OrganizationNode(BaseModel):
         verbose_name="Contenu détaillé",
         help_text="Contenu riche affiché dans l'overlay (supporte le markdown)"
     )
+    content_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Contenu détaillé (HTML)",
+        help_text="Rendu HTML assaini du contenu, mis à jour à l'enregistrement"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="Empreinte du contenu rendu (source + version du moteur)"
+    )
     cta_text = models.CharField(
         max_length=50,
         blank=True,
@@ -171,6 +202,73 @@ class OrganizationNode(BaseModel):
     def __str__(self):
         return self.name
 
+    @property
+    def depth(self):
+        """0 pour un noeud racine."""
+        return self.path.count(self.PATH_SEPARATOR) - 1
+
+    def build_path(self):
+        segment = self.id.hex + self.PATH_SEPARATOR
+        if self.parent_id is None:
+            return segment
+        return self.parent.path + segment
+
+    def clean(self):
+        super().clean()
+        if self.parent_id and self.path and self.parent.path.startswith(self.path):
+            raise ValidationError({'parent': "Un noeud ne peut pas être rattaché à l'un de ses descendants."})
+
+    def render_content(self, force=False):
+        """Render ``content`` to ``content_html`` unless it is already up to date."""
+        digest = content_hash(self.content)
+        if not force and digest == self.content_hash:
+            return False
+        self.content_html = render_markdown(self.content)
+        self.content_hash = digest
+        return True
+
+    def save(self, *args, **kwargs):
+        old_path = self.path
+        self.path = self.build_path()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.render_content()
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'parent' in update_fields:
+                update_fields.add('path')
+            if 'content' in update_fields:
+                update_fields.update({'content_html', 'content_hash'})
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+        if old_path and old_path != self.path:
+            # Re-parenting: rewrite the prefix of the whole subtree in one UPDATE
+            OrganizationNode.objects.filter(
+                path__startswith=old_path
+            ).exclude(pk=self.pk).update(
+                path=Concat(
+                    Value(self.path),
+                    Substr('path', len(old_path) + 1),
+                    output_field=models.CharField(),
+                )
+            )
+
+    def get_descendants(self, include_self=False):
+        """Sous-arbre complet du noeud (une requête sur l'index du chemin)."""
+        nodes = OrganizationNode.objects.filter(path__startswith=self.path)
+        if not include_self:
+            nodes = nodes.exclude(pk=self.pk)
+        return nodes
+
+    def get_ancestors(self, include_self=False):
+        """Ancêtres du noeud, de la racine vers le parent."""
+        segments = [segment for segment in self.path.split(self.PATH_SEPARATOR) if segment]
+        if not include_self:
+            segments = segments[:-1]
+        return OrganizationNode.objects.filter(
+            pk__in=[uuid.UUID(segment) for segment in segments]
+        ).order_by(Length('path'))
+
 class OrganizationRole(BaseModel):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
@@ -246,6 +344,10 @@ class NodeEvent(BaseModel):
         verbose_name = "Événement"
         verbose_name_plural = "Événements"
         ordering = ['start_datetime']
+        indexes = [
+            # Agenda des événements par date (apps.events.agenda)
+            models.Index(fields=['start_datetime', 'id'], name='nodeevent_start_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.node.name}"
@@ -0,0 +1,147 @@
+"""
+Vectorized orbit and entry-trajectory evaluation.
+
+NumPy port of ``frontend/src/lib/physics.ts`` and of the entry animation of
+``Scene3DAdvanced``, used to precompute keyframes for clients that cannot
+afford per-frame physics (mobile app, static previews).
+
+Conventions follow the frontend:
+
+* orbital angle ``t = -(time * orbit_speed * speed) + orbit_phase``;
+* ``circle`` orbits use ``(cos t, sin t) * radius`` in the XZ plane, y = 0;
+* ``squircle`` orbits cast a ray at angle ``t`` onto a rounded square
+  (``orbit_roundness``: 0 = square, 1 = circle);
+* the entry is a straight line from ``(entry_start_x, entry_start_y,
+  entry_start_z or orbit_radius)`` to ``(0, 0, orbit_radius)``, moving along
+  X at ``entry_speed / 10`` units per second, after which the planet joins
+  its orbit at angle pi/2 (the point ``(0, 0, radius)``);
+* planet ``i`` starts its entry ``i * stagger`` seconds after time 0.
+
+The frontend adds a small random variation to the entry speed; keyframes
+are deterministic and use the configured speed.
+"""
+import numpy as np
+
+# Same epsilon as getSquirclePosition
+EPSILON = 1e-9
+
+# Delay between two planet entries (PLANET_STAGGER_DELAY, in seconds)
+DEFAULT_STAGGER = 0.2
+
+NODE_FIELDS = [
+    'orbit_radius', 'orbit_speed', 'orbit_phase', 'orbit_shape', 'orbit_roundness',
+    'entry_start_x', 'entry_start_y', 'entry_start_z', 'entry_speed',
+]
+
+
+def circular_positions(t, radius):
+    """Vectorized getCircularPosition centered on the origin: returns (x, y, z)."""
+    t, radius = np.broadcast_arrays(np.asarray(t, dtype=float), np.asarray(radius, dtype=float))
+    return np.cos(t) * radius, np.zeros_like(t), np.sin(t) * radius
+
+
+def squircle_positions(t, radius, roundness=0.6):
+    """Vectorized getSquirclePosition centered on the origin: returns (x, y, z)."""
+    t, radius, roundness = np.broadcast_arrays(
+        np.asarray(t, dtype=float),
+        np.asarray(radius, dtype=float),
+        np.asarray(roundness, dtype=float),
+    )
+    k = np.clip(roundness, 0, 1)
+    corner_radius = radius * k
+    d = radius * (1 - k)
+
+    cos_t = np.cos(t)
+    sin_t = np.sin(t)
+    abs_cos = np.abs(cos_t)
+    abs_sin = np.abs(sin_t)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tan_t = abs_sin / abs_cos
+        cot_t = abs_cos / abs_sin
+
+        # Ray hits the flat right edge (x = radius)
+        right_edge = (abs_cos >= EPSILON) & (radius * tan_t <= d)
+        # Ray hits the flat top edge (z = radius)
+        top_edge = ~right_edge & (abs_sin > EPSILON) & (radius * cot_t <= d)
+
+        # Ray / corner arc intersection: alpha^2 + B alpha + C = 0
+        b = -2 * d * (abs_cos + abs_sin)
+        c = 2 * d * d - corner_radius * corner_radius
+        delta = b * b - 4 * c
+        alpha = (-b + np.sqrt(np.where(delta >= 0, delta, 0))) / 2
+        alpha = np.where(delta >= 0, alpha, radius)
+
+        x_local = np.where(right_edge, radius, np.where(top_edge, radius * cot_t, alpha * abs_cos))
+        z_local = np.where(right_edge, radius * tan_t, np.where(top_edge, radius, alpha * abs_sin))
+    return np.sign(cos_t) * x_local, np.zeros_like(t), np.sign(sin_t) * z_local
+
+
+def orbit_positions(t, radius, shape, roundness):
+    """Dispatch per node between circle and squircle orbits."""
+    circle = circular_positions(t, radius)
+    squircle = squircle_positions(t, radius, roundness)
+    is_squircle = np.asarray(shape) == 'squircle'
+    return tuple(np.where(is_squircle, s, c) for s, c in zip(squircle, circle))
+
+
+def evaluate_positions(nodes, times, speed=1.0, spacing=1.0, entry=True, stagger=DEFAULT_STAGGER):
+    """
+    Positions of every node at every time, in one vectorized pass.
+
+    ``nodes`` is a sequence of dicts holding ``NODE_FIELDS``; ``times`` are in
+    seconds since the start of the scene. ``speed`` and ``spacing`` are the
+    global multipliers of the frontend (planetSpeed, orbitSpacing).
+
+    Returns an array of shape ``(len(times), len(nodes), 3)``.
+    """
+    times = np.asarray(times, dtype=float)[:, np.newaxis]
+    if not len(nodes):
+        return np.zeros((len(times), 0, 3))
+
+    def column(name, default=np.nan):
+        return np.array([
+            node[name] if node[name] is not None else default for node in nodes
+        ], dtype=float)
+
+    orbit_radius = column('orbit_radius')
+    angular_speed = column('orbit_speed') * speed
+    phase = column('orbit_phase')
+    roundness = column('orbit_roundness')
+    shape = np.array([node['orbit_shape'] for node in nodes])
+    effective_radius = orbit_radius * spacing
+
+    if not entry:
+        t = -(times * angular_speed) + phase
+        return np.stack(orbit_positions(t, effective_radius, shape, roundness), axis=-1)
+
+    start_x = column('entry_start_x')
+    start_y = column('entry_start_y')
+    start_z = np.where(np.isnan(column('entry_start_z')), orbit_radius, column('entry_start_z'))
+    velocity = column('entry_speed') / 10
+
+    delay = np.arange(len(nodes)) * stagger
+    local_time = np.maximum(times - delay, 0)
+
+    # Duration of the straight line (0 when the start is already past x = 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        duration = np.where(start_x < 0, -start_x / velocity, 0)
+
+    # Straight line
+    current_x = np.minimum(start_x + velocity * local_time, 0)
+    current_x = np.where(start_x < 0, current_x, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        progress = np.clip((current_x - start_x) / (0 - start_x), 0, 1)
+    progress = np.where(start_x < 0, progress, 1)
+    line = (
+        current_x,
+        start_y + (0 - start_y) * progress,
+        start_z + (orbit_radius - start_z) * progress,
+    )
+
+    # Orbit, joined at angle pi/2 when the line ends
+    t = np.pi / 2 - (local_time - duration) * angular_speed
+    orbit = orbit_positions(t, effective_radius, shape, roundness)
+
+    on_line = local_time < duration
+    return np.stack([np.where(on_line, l, o) for l, o in zip(line, orbit)], axis=-1)
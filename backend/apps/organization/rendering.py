@@ -0,0 +1,27 @@
+"""
+Markdown rendering of OrganizationNode.content.
+
+The HTML is rendered once when the node is saved and stored next to the
+source, along with a hash of the source and of the renderer version, so
+unchanged content is never rendered twice.
+"""
+import hashlib
+
+import markdown
+import nh3
+
+# Bump whenever the output of render_markdown() changes, then run
+# ``python manage.py render_node_content`` to refresh the stored HTML.
+RENDERER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ['extra', 'sane_lists']
+
+
+def render_markdown(source):
+    """Render markdown to sanitized HTML (no scripts, styles or event handlers)."""
+    html = markdown.markdown(source, extensions=MARKDOWN_EXTENSIONS, output_format='html')
+    return nh3.clean(html, link_rel='noopener noreferrer nofollow')
+
+
+def content_hash(source):
+    return hashlib.sha256(f'{RENDERER_VERSION}:{source}'.encode('utf-8')).hexdigest()
@@ -0,0 +1,84 @@
+"""
+Compact binary snapshot of the 3D scene.
+
+Layout (all integers and floats little-endian)::
+
+    uint32        header length H
+    H bytes       UTF-8 JSON header
+    0-3 bytes     zero padding, so columns start on a 4-byte boundary
+    float32[n]    one column per name of ``header["columns"]``, in order
+
+With ``start = 4 + H`` rounded up to a multiple of 4, column ``i`` starts at
+byte ``start + 4 * count * i``, so a client can read it with
+``new Float32Array(buffer, offset, header.count)`` without copying.
+Missing values (``entry_start_z`` is nullable) are encoded as NaN.
+"""
+import json
+import struct
+import sys
+from array import array
+
+from django.core.files.storage import default_storage
+
+from apps.organization.models import OrganizationNode
+
+SCENE_FORMAT_VERSION = 1
+
+SCENE_FLOAT_FIELDS = [
+    'orbit_radius', 'orbit_speed', 'planet_scale', 'rotation_speed',
+    'orbit_phase', 'orbit_roundness',
+    'entry_start_x', 'entry_start_y', 'entry_start_z', 'entry_speed',
+]
+
+SCENE_HEADER_FIELDS = [
+    'id', 'slug', 'name', 'parent_id',
+    'visual_source', 'planet_type', 'orbit_shape', 'planet_color',
+]
+
+SCENE_FILE_FIELDS = ['model_3d', 'planet_texture']
+
+
+def build_scene_snapshot(build_url=None):
+    """
+    Pack the visible nodes of the 3D scene (one query).
+
+    ``build_url`` turns a relative media URL into the URL sent to the client
+    (typically ``request.build_absolute_uri``).
+    """
+    rows = list(
+        OrganizationNode.objects.filter(is_visible_3d=True).values_list(
+            *SCENE_HEADER_FIELDS, *SCENE_FILE_FIELDS, *SCENE_FLOAT_FIELDS
+        )
+    )
+    header_width = len(SCENE_HEADER_FIELDS)
+    file_width = len(SCENE_FILE_FIELDS)
+
+    header = {
+        'version': SCENE_FORMAT_VERSION,
+        'count': len(rows),
+    }
+    for index, name in enumerate(SCENE_HEADER_FIELDS):
+        values = [row[index] for row in rows]
+        if name in ('id', 'parent_id'):
+            values = [str(value) if value is not None else None for value in values]
+        header[name] = values
+    for index, name in enumerate(SCENE_FILE_FIELDS, start=header_width):
+        urls = []
+        for row in rows:
+            url = default_storage.url(row[index]) if row[index] else None
+            urls.append(build_url(url) if url and build_url else url)
+        header[name] = urls
+    header['columns'] = SCENE_FLOAT_FIELDS
+
+    columns = []
+    for index in range(header_width + file_width, header_width + file_width + len(SCENE_FLOAT_FIELDS)):
+        column = array('f', (
+            row[index] if row[index] is not None else float('nan') for row in rows
+        ))
+        if sys.byteorder == 'big':
+            column.byteswap()
+        columns.append(column.tobytes())
+
+    encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    padding = b'\0' * (-(4 + len(encoded)) % 4)
+    return b''.join([struct.pack('<I', len(encoded)), encoded, padding, *columns])
@@ -0,0 +1,28 @@
+from django.db.models import Value
+from django.db.models.functions import StrIndex, Substr
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.cache import bump_version
+from apps.organization.models import NodeEvent, OrganizationNode
+from apps.organization.tree import TREE_VERSION_KEY
+
+
+@receiver(post_save, sender=OrganizationNode)
+@receiver(post_delete, sender=OrganizationNode)
+@receiver(post_save, sender=NodeEvent)
+@receiver(post_delete, sender=NodeEvent)
+def bump_tree_version(sender, **kwargs):
+    bump_version(TREE_VERSION_KEY)
+
+
+@receiver(post_delete, sender=OrganizationNode)
+def detach_orphaned_subtrees(sender, instance, **kwargs):
+    """
+    Children of a deleted node are re-attached to the root (parent SET_NULL):
+    strip every path up to and including the deleted node's segment.
+    """
+    segment = instance.id.hex + OrganizationNode.PATH_SEPARATOR
+    OrganizationNode.objects.filter(path__contains=segment).update(
+        path=Substr('path', StrIndex('path', Value(segment)) + len(segment))
+    )
@@ -0,0 +1,28 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.organization.models import OrganizationNode
+
+
+class NodeFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        OrganizationNode.objects.create(name="Racine", slug='racine', type='ROOT', content="**Bienvenue**")
+
+    def get_node(self, **params):
+        response = self.client.get('/api/organization/nodes/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results'][0]
+
+    def test_fields_select_the_fields(self):
+        self.assertEqual(set(self.get_node(fields='id,name')), {'id', 'name'})
+
+    def test_include_adds_opt_in_fields_to_the_selection(self):
+        node = self.get_node(fields='id,name', include='content_html')
+        self.assertEqual(set(node), {'id', 'name', 'content_html'})
+        self.assertIn('<strong>Bienvenue</strong>', node['content_html'])
+
+    def test_opt_in_fields_are_hidden_by_default(self):
+        self.assertNotIn('content_html', self.get_node())
@@ -0,0 +1,142 @@
+"""
+Helpers to assemble the organization tree in memory.
+
+The node table is small and always read as a whole by the 3D explorer, so
+loading it in a single query and grouping it by parent is much cheaper than
+letting the serializer walk ``node.children`` recursively.
+"""
+import bisect
+import json
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from apps.core.cache import PAYLOAD_TIMEOUT, get_version
+from apps.organization.models import NodeEvent
+
+UPCOMING_EVENTS_LIMIT = 10
+
+# Bumped on every OrganizationNode / NodeEvent save or delete (see signals.py)
+TREE_VERSION_KEY = 'organization:tree-version'
+
+
+def tree_etag(request, *args, **kwargs):
+    """Strong ETag of the node tree endpoints, derived from the tree version."""
+    return f'"org-tree-{get_version(TREE_VERSION_KEY)}"'
+
+
+# Upcoming event starts kept with the tree version they were read at
+EVENT_STARTS_KEY = 'organization:event-starts'
+EVENT_STARTS_LIMIT = 100
+
+
+def load_event_starts(version, now):
+    """Read (and cache) the next upcoming event starts, as timestamps."""
+    starts = [
+        start.timestamp() for start in NodeEvent.objects.filter(start_datetime__gte=now).order_by(
+            'start_datetime'
+        ).values_list('start_datetime', flat=True)[:EVENT_STARTS_LIMIT]
+    ]
+    entry = {'version': version, 'starts': starts, 'complete': len(starts) < EVENT_STARTS_LIMIT}
+    cache.set(EVENT_STARTS_KEY, entry, PAYLOAD_TIMEOUT)
+    return entry
+
+
+def tree_events_etag(request, *args, **kwargs):
+    """
+    ETag of the endpoints embedding the upcoming events: the tree version,
+    plus the next event start, since an event leaves the payload as soon as
+    it starts, without any write.
+
+    The version and the upcoming starts are fetched in one cache round
+    trip; the database is only read again when the tree changes or once
+    the cached starts are all past.
+    """
+    cached = cache.get_many([TREE_VERSION_KEY, EVENT_STARTS_KEY])
+    version = cached.get(TREE_VERSION_KEY)
+    if version is None:
+        version = get_version(TREE_VERSION_KEY)
+    now = timezone.now()
+    entry = cached.get(EVENT_STARTS_KEY)
+    if entry is None or entry['version'] != version:
+        entry = load_event_starts(version, now)
+    index = bisect.bisect_left(entry['starts'], now.timestamp())
+    if index == len(entry['starts']) and not entry['complete']:
+        entry = load_event_starts(version, now)
+        index = 0
+    start = entry['starts'][index] if index < len(entry['starts']) else 0
+    return f'"org-tree-{version}-{int(start)}"'
+
+
+def build_children_map(nodes):
+    """
+    Group an iterable of OrganizationNode by parent id.
+
+    Returns a dict ``{parent_id: [child, ...]}`` where root nodes are stored
+    under the ``None`` key. Order of the iterable is preserved.
+    """
+    children_map = defaultdict(list)
+    for node in nodes:
+        children_map[node.parent_id].append(node)
+    return children_map
+
+
+def load_upcoming_events(node_ids=None, limit=UPCOMING_EVENTS_LIMIT):
+    """
+    Fetch the upcoming NodeEvent rows of many nodes in a single query.
+
+    Events are ranked per node with ``ROW_NUMBER()`` (featured first, then by
+    start date) and only the first ``limit`` of each node are kept. Works on
+    SQLite (3.25+) and PostgreSQL.
+
+    Returns a dict ``{node_id: [event, ...]}``.
+    """
+    events = NodeEvent.objects.filter(start_datetime__gte=timezone.now())
+    if node_ids is not None:
+        events = events.filter(node_id__in=node_ids)
+    events = events.annotate(
+        rank=Window(
+            expression=RowNumber(),
+            partition_by=[F('node_id')],
+            order_by=[F('is_featured').desc(), F('start_datetime').asc()],
+        )
+    ).filter(rank__lte=limit).order_by('node_id', 'rank')
+
+    events_map = defaultdict(list)
+    for event in events:
+        events_map[event.node_id].append(event)
+    return events_map
+
+
+STRUCTURE_FIELDS = ('id', 'name', 'slug', 'type', 'parent_id')
+
+
+def iter_structure_json(nodes, chunk_size=2000):
+    """
+    Stream ``{"nodes": [...]}`` for a node queryset, one chunk of rows at a time.
+
+    Rows are read as tuples through a chunked server-side iterator, so memory
+    stays flat whatever the number of nodes.
+    """
+    yield b'{"nodes":['
+    separator = ''
+    batch = []
+    rows = nodes.order_by().values_list(*STRUCTURE_FIELDS).iterator(chunk_size=chunk_size)
+    for node_id, name, slug, node_type, parent_id in rows:
+        batch.append(separator + json.dumps({
+            'id': str(node_id),
+            'name': name,
+            'slug': slug,
+            'type': node_type,
+            'parent_id': str(parent_id) if parent_id else None,
+        }, ensure_ascii=False, separators=(',', ':')))
+        separator = ','
+        if len(batch) >= chunk_size:
+            yield ''.join(batch).encode('utf-8')
+            batch = []
+    if batch:
+        yield ''.join(batch).encode('utf-8')
+    yield b']}'
@@ -95,6 +95,24 @@ DATABASES = {
 }
 
 
+# Cache
+# Redis when REDIS_URL is set, in-process memory otherwise (dev, tests)
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -175,3 +193,14 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '4.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
 }
+
+# Event passes: minutes a reserved pass is held while the buyer pays
+PASS_HOLD_MINUTES = int(os.getenv('PASS_HOLD_MINUTES', '15'))
+
+# Event waiting room (apps.events.waiting_room): cache alias holding the
+# queues (a cache shared by all processes, i.e. Redis), default admission
+# rate (buyers per second) and burst, lifetime of a queue token in seconds
+WAITING_ROOM_CACHE = os.getenv('WAITING_ROOM_CACHE', 'default')
+WAITING_ROOM_RATE = float(os.getenv('WAITING_ROOM_RATE', '2'))
+WAITING_ROOM_BURST = int(os.getenv('WAITING_ROOM_BURST', '20'))
+WAITING_ROOM_TOKEN_MAX_AGE = int(os.getenv('WAITING_ROOM_TOKEN_MAX_AGE', str(60 * 60 * 2)))
@@ -9,11 +9,11 @@ from rest_framework.routers import DefaultRouter
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
 # Import all ViewSets
-from apps.core.api.views import DanceStyleViewSet, LevelViewSet, DanceProfessionViewSet, SiteConfigurationViewSet, MenuItemViewSet
+from apps.core.api.views import DanceStyleViewSet, LevelViewSet, DanceProfessionViewSet, SiteConfigurationViewSet, MenuItemViewSet, BootstrapViewSet
 from apps.users.api.views import UserViewSet
 from apps.organization.api.views import OrganizationNodeViewSet, OrganizationRoleViewSet
 from apps.courses.api.views import CourseViewSet, EnrollmentViewSet
-from apps.events.api.views import EventViewSet, RegistrationViewSet
+from apps.events.api.views import EventViewSet, PassHoldViewSet, RegistrationViewSet, WaitingRoomViewSet
 from apps.shop.api.views import ProductViewSet, OrderViewSet
 
 router = DefaultRouter()
@@ -23,6 +23,7 @@ router.register(r'common/styles', DanceStyleViewSet, basename='style')
 router.register(r'common/levels', LevelViewSet, basename='level')
 router.register(r'common/professions', DanceProfessionViewSet, basename='profession')
 router.register(r'common/config', SiteConfigurationViewSet, basename='config')
+router.register(r'common/bootstrap', BootstrapViewSet, basename='bootstrap')
 router.register(r'menu/items', MenuItemViewSet, basename='menu-item')
 
 # Users
@@ -33,10 +34,14 @@ router.register(r'organization/nodes', OrganizationNodeViewSet, basename='node')
 router.register(r'organization/roles', OrganizationRoleViewSet, basename='org-role')
 
 # Business
-router.register(r'courses', CourseViewSet, basename='course')
+# Before 'courses': its detail route would otherwise capture "enrollments" as a slug
 router.register(r'courses/enrollments', EnrollmentViewSet, basename='enrollment')
-router.register(r'events', EventViewSet, basename='event')
+router.register(r'courses', CourseViewSet, basename='course')
+# Before 'events', for the same reason
 router.register(r'events/registrations', RegistrationViewSet, basename='registration')
+router.register(r'events/holds', PassHoldViewSet, basename='pass-hold')
+router.register(r'events/waiting-room', WaitingRoomViewSet, basename='waiting-room')
+router.register(r'events', EventViewSet, basename='event')
 router.register(r'shop/products', ProductViewSet, basename='product')
 router.register(r'shop/orders', OrderViewSet, basename='order')
 
@@ -110,7 +110,7 @@ export default function EventsPage() {
                                             <div className="flex items-center gap-2 px-3 py-1.5 rounded-xl bg-white/5 border border-white/5">
                                                 <Ticket className="w-4 h-4 text-emerald-500" />
                                                 <span className="text-[10px] font-black text-white uppercase tracking-widest">
-                                                    À partir de {event.passes?.[0]?.price || 'N/A'}€
+                                                    À partir de {event.min_price ?? 'N/A'}€
                                                 </span>
                                             </div>
                                         </div>
@@ -47,10 +47,9 @@ export default function GlobalPlanetConfigPanel({ isOpen, onClose }: GlobalPlane
     // Save all mutations
     const saveMutation = useMutation({
         mutationFn: async () => {
-            const promises = Object.entries(modifications).map(([slug, changes]) => {
-                return api.patch(`/organization/nodes/${slug}/`, changes);
-            });
-            return Promise.all(promises);
+            // One transactional request for all modified planets
+            const items = Object.entries(modifications).map(([slug, changes]) => ({ slug, changes }));
+            return api.patch('/organization/nodes/bulk/', items);
         },
         onSuccess: () => {
             setSaveStatus('success');
@@ -0,0 +1,50 @@
+import api from '@/lib/api';
+
+// Binary scene snapshot served by /organization/nodes/scene/
+// (layout documented in backend/apps/organization/scene.py)
+
+export interface SceneSnapshotHeader {
+    version: number;
+    count: number;
+    id: string[];
+    slug: string[];
+    name: string[];
+    parent_id: (string | null)[];
+    visual_source: string[];
+    planet_type: string[];
+    orbit_shape: string[];
+    planet_color: string[];
+    model_3d: (string | null)[];
+    planet_texture: (string | null)[];
+    columns: string[];
+}
+
+export interface SceneSnapshot {
+    header: SceneSnapshotHeader;
+    // One Float32Array per numeric field, viewing the response buffer (no copy)
+    columns: Record<string, Float32Array>;
+}
+
+export function parseSceneSnapshot(buffer: ArrayBuffer): SceneSnapshot {
+    const view = new DataView(buffer);
+    const headerLength = view.getUint32(0, true);
+    const header: SceneSnapshotHeader = JSON.parse(
+        new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength))
+    );
+
+    // Columns start on the next 4-byte boundary after the header
+    const start = Math.ceil((4 + headerLength) / 4) * 4;
+    const columns: Record<string, Float32Array> = {};
+    header.columns.forEach((name, i) => {
+        columns[name] = new Float32Array(buffer, start + i * header.count * 4, header.count);
+    });
+
+    return { header, columns };
+}
+
+export async function fetchSceneSnapshot(): Promise<SceneSnapshot> {
+    const response = await api.get<ArrayBuffer>('/organization/nodes/scene/', {
+        responseType: 'arraybuffer',
+    });
+    return parseSceneSnapshot(response.data);
+}